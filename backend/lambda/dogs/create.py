@@ -1,16 +1,275 @@
-import json
 import os
-import uuid
-from datetime import datetime
+import time
+from binascii import b2a_base64
+from functools import lru_cache
+from datetime import date
 from decimal import Decimal
 import boto3
+from boto3.dynamodb.types import TypeSerializer
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+
+
+def _json_default(obj):
+    """Encode DynamoDB Decimals as JSON numbers and anything else as a string"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    return str(obj)
+
+
+try:
+    import orjson
+
+    def _dumps(obj):
+        """Serialize a response body, with Decimals as numbers"""
+        return orjson.dumps(obj, default=_json_default).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    # Fallback for deployments without the shared Lambda layer
+    import json
+
+    def _dumps(obj):
+        """Serialize a response body, with Decimals as numbers"""
+        return json.dumps(obj, default=_json_default)
+
+    _loads = json.loads
 
 # Environment variables
 DOGS_TABLE = os.environ.get("DOGS_TABLE", "pupper-dogs")
 
-# AWS clients
-dynamodb = boto3.resource("dynamodb")
-dogs_table = dynamodb.Table(DOGS_TABLE)
+# Fields every create request must supply
+REQUIRED_FIELDS = ("shelter_name", "city", "state", "dog_name", "dog_species", "dog_weight")
+
+# BatchWriteItem accepts at most 25 put requests per call
+BATCH_WRITE_SIZE = 25
+BATCH_WRITE_MAX_RETRIES = 5
+
+# Most dogs one bulk request may create; each 25-dog chunk can spend about
+# 1.5 s backing off, which has to fit in the function timeout
+MAX_BATCH_DOGS = 100
+
+# Shared response headers (CORS enabled)
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
+    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
+}
+
+# Keep connections alive across warm invocations and back off adaptively
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    max_pool_connections=10,
+    connect_timeout=2,
+)
+
+# AWS clients. The low-level client skips the resource layer's per-item
+# wrapping; records are marshalled explicitly before writing
+dynamodb_client = boto3.client("dynamodb", config=BOTO_CONFIG)
+_serialize = TypeSerializer().serialize
+
+# Open the DynamoDB connection (DNS, TCP, TLS) during Lambda init rather
+# than on the first request; skipped outside Lambda, e.g. in tests
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    try:
+        dynamodb_client.describe_table(TableName=DOGS_TABLE)
+    except Exception:
+        pass  # Best effort; the first request connects on its own
+
+
+def utc_now_iso():
+    """Current UTC time in ISO 8601 format with a trailing Z"""
+    now_ns = time.time_ns()
+    t = time.gmtime(now_ns // 1_000_000_000)
+    return (
+        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+        f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+        f".{now_ns // 1000 % 1_000_000:06d}Z"
+    )
+
+
+def new_sortable_id():
+    """
+    Time-ordered 128-bit ID (ULID layout, hex encoded): 48-bit millisecond
+    timestamp followed by 80 random bits
+    """
+    return f"{time.time_ns() // 1_000_000:012x}{os.urandom(10).hex()}"
+
+
+def _resp(status_code, body):
+    """Build an API Gateway proxy response"""
+    return {
+        "statusCode": status_code,
+        "headers": CORS_HEADERS,
+        "body": _dumps(body)
+    }
+
+
+def to_dynamodb_item(record):
+    """Marshal a flat dog record into DynamoDB attribute values"""
+    return {name: _serialize(value) for name, value in record.items()}
+
+
+def parse_mdy(date_str):
+    """Parse an MM/DD/YYYY date without going through strptime"""
+    month, day, year = date_str.split("/")
+    return date(int(year), int(month), int(day))
+
+
+# Ages are computed in Decimal, which DynamoDB numbers are stored as anyway
+DAYS_PER_YEAR = Decimal("365.25")
+ONE_DECIMAL_PLACE = Decimal("0.1")
+
+
+@lru_cache(maxsize=1024)
+def calculate_age_years(birthday_str, today):
+    """Age in years, as a Decimal to one decimal place, on the given day
+
+    Cached: shelters upload many dogs sharing a birthday, and today only
+    changes once a day.
+    """
+    days = (today - parse_mdy(birthday_str)).days
+    return (Decimal(days) / DAYS_PER_YEAR).quantize(ONE_DECIMAL_PLACE)
+
+
+def missing_required_field(dog):
+    """Return the first required field missing from a dog payload, if any"""
+    for field in REQUIRED_FIELDS:
+        if not dog.get(field):
+            return field
+    return None
+
+
+def build_dog_record(dog, current_time):
+    """Build the stored dog record from a validated request payload"""
+    # Calculate age (simple version)
+    try:
+        age_decimal = calculate_age_years(dog.get("dog_birthday", "1/1/2020"), date.today())
+    except (ValueError, TypeError, AttributeError):
+        age_decimal = Decimal('1.0')
+    
+    # Encrypt dog name (simple base64)
+    dog_name_encrypted = b2a_base64(dog["dog_name"].encode(), newline=False).decode("ascii")
+    
+    return {
+        "dog_id": new_sortable_id(),
+        "shelter_name": dog["shelter_name"],
+        "city": dog["city"],
+        "state": dog["state"].upper(),
+        "dog_name_encrypted": dog_name_encrypted,
+        "dog_species": dog["dog_species"],
+        "shelter_entry_date": dog.get("shelter_entry_date", "1/1/2024"),
+        "dog_description": dog.get("dog_description", ""),
+        "dog_birthday": dog.get("dog_birthday", "1/1/2020"),
+        "dog_weight": int(dog["dog_weight"]),
+        "dog_color": dog.get("dog_color", "brown").lower(),
+        "dog_age_years": age_decimal,
+        "dog_photo_url": dog.get("dog_photo_url", ""),
+        "dog_photo_400x400_url": "",
+        "dog_photo_50x50_url": "",
+        "shelter_id": dog.get("shelter_id", ""),
+        "created_at": current_time,
+        "updated_at": current_time,
+        "is_labrador": "labrador" in dog["dog_species"].lower(),
+        "wag_count": 0,
+        "growl_count": 0,
+        "status": "available"
+    }
+
+
+def to_response_data(dog_record, dog_name):
+    """Swap the stored encrypted name for the plain one in a response copy"""
+    response_data = dog_record.copy()
+    response_data["dog_name"] = dog_name  # Return unencrypted name
+    del response_data["dog_name_encrypted"]
+    return response_data
+
+
+def write_dog_batch(items):
+    """
+    Write up to BATCH_WRITE_SIZE marshalled items, retrying unprocessed ones
+    with exponential backoff. Returns the dog_ids that could not be written;
+    if a call fails, those are the items no earlier attempt had stored.
+    """
+    request_items = {DOGS_TABLE: [{"PutRequest": {"Item": item}} for item in items]}
+    
+    for attempt in range(BATCH_WRITE_MAX_RETRIES + 1):
+        try:
+            response = dynamodb_client.batch_write_item(RequestItems=request_items)
+        except (ClientError, BotoCoreError) as e:
+            print(f"Error writing dog batch: {str(e)}")
+            break
+        request_items = response.get("UnprocessedItems") or {}
+        if not request_items:
+            return set()
+        if attempt < BATCH_WRITE_MAX_RETRIES:
+            time.sleep(min(2 ** attempt * 0.05, 1.0))
+    
+    return {
+        request["PutRequest"]["Item"]["dog_id"]["S"]
+        for request in request_items.get(DOGS_TABLE, [])
+    }
+
+
+def create_dogs_batch(dogs):
+    """Create many dogs with BatchWriteItem and report a status per input item"""
+    current_time = utc_now_iso()
+    results = [None] * len(dogs)
+    pending = []  # (index, dog_record, plain dog name)
+    
+    for index, dog in enumerate(dogs):
+        if not isinstance(dog, dict):
+            results[index] = {"index": index, "success": False, "error": "Dog entry must be an object"}
+            continue
+        
+        missing_field = missing_required_field(dog)
+        if missing_field:
+            results[index] = {"index": index, "success": False, "error": f"Missing required field: {missing_field}"}
+            continue
+        
+        try:
+            dog_record = build_dog_record(dog, current_time)
+        except (ValueError, TypeError, AttributeError) as e:
+            results[index] = {"index": index, "success": False, "error": f"Invalid dog data: {str(e)}"}
+            continue
+        
+        pending.append((index, dog_record, dog["dog_name"]))
+    
+    print(f"Batch writing {len(pending)} of {len(dogs)} dogs")
+    
+    for start in range(0, len(pending), BATCH_WRITE_SIZE):
+        chunk = pending[start:start + BATCH_WRITE_SIZE]
+        # Earlier chunks are already saved, so a failed write is reported
+        # per item rather than failing the whole request
+        failed_ids = write_dog_batch([to_dynamodb_item(record) for _, record, _ in chunk])
+        
+        for index, dog_record, dog_name in chunk:
+            if dog_record["dog_id"] in failed_ids:
+                results[index] = {"index": index, "success": False, "error": "Failed to save dog"}
+            else:
+                results[index] = {"index": index, "success": True, **to_response_data(dog_record, dog_name)}
+    
+    created_count = sum(1 for result in results if result["success"])
+    
+    if created_count:
+        status_code = 201
+    elif pending:
+        # Valid dogs went unsaved (throttling, an outage), so retrying can help
+        status_code = 503
+    else:
+        status_code = 400
+    
+    return _resp(status_code, {
+        "success": created_count == len(dogs),
+        "data": {
+            "message": f"Added {created_count} of {len(dogs)} dogs to the system",
+            "created": created_count,
+            "failed": len(dogs) - created_count,
+            "results": results
+        }
+    })
 
 
 def lambda_handler(event, context):
@@ -21,123 +280,57 @@ def lambda_handler(event, context):
         
         # Parse request body
         if not event.get("body"):
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": False,
-                    "error": "Request body is required"
-                })
-            }
+            return _resp(400, {
+                "success": False,
+                "error": "Request body is required"
+            })
         
-        body = json.loads(event["body"])
+        body = _loads(event["body"])
         print(f"Request body: {body}")
         
+        # Bulk create (e.g. shelter onboarding)
+        if isinstance(body.get("dogs"), list):
+            if not body["dogs"]:
+                return _resp(400, {
+                    "success": False,
+                    "error": "dogs must contain at least one dog"
+                })
+            if len(body["dogs"]) > MAX_BATCH_DOGS:
+                return _resp(400, {
+                    "success": False,
+                    "error": f"dogs may contain at most {MAX_BATCH_DOGS} dogs"
+                })
+            return create_dogs_batch(body["dogs"])
+        
         # Validate required fields
-        required_fields = ["shelter_name", "city", "state", "dog_name", "dog_species", "dog_weight"]
-        for field in required_fields:
-            if not body.get(field):
-                return {
-                    "statusCode": 400,
-                    "headers": {
-                        "Content-Type": "application/json",
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                        "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                    },
-                    "body": json.dumps({
-                        "success": False,
-                        "error": f"Missing required field: {field}"
-                    })
-                }
+        missing_field = missing_required_field(body)
+        if missing_field:
+            return _resp(400, {
+                "success": False,
+                "error": f"Missing required field: {missing_field}"
+            })
         
         # Create dog record
-        dog_id = str(uuid.uuid4())
-        current_time = datetime.utcnow().isoformat() + "Z"
-        
-        # Calculate age (simple version)
-        try:
-            birthday = datetime.strptime(body.get("dog_birthday", "1/1/2020"), "%m/%d/%Y")
-            age_years = (datetime.now() - birthday).days / 365.25
-            age_decimal = Decimal(str(round(age_years, 1)))
-        except:
-            age_decimal = Decimal('1.0')
-        
-        # Encrypt dog name (simple base64)
-        import base64
-        dog_name_encrypted = base64.b64encode(body["dog_name"].encode()).decode()
-        
-        dog_record = {
-            "dog_id": dog_id,
-            "shelter_name": body["shelter_name"],
-            "city": body["city"],
-            "state": body["state"].upper(),
-            "dog_name_encrypted": dog_name_encrypted,
-            "dog_species": body["dog_species"],
-            "shelter_entry_date": body.get("shelter_entry_date", "1/1/2024"),
-            "dog_description": body.get("dog_description", ""),
-            "dog_birthday": body.get("dog_birthday", "1/1/2020"),
-            "dog_weight": int(body["dog_weight"]),
-            "dog_color": body.get("dog_color", "brown").lower(),
-            "dog_age_years": age_decimal,
-            "dog_photo_url": body.get("dog_photo_url", ""),
-            "dog_photo_400x400_url": "",
-            "dog_photo_50x50_url": "",
-            "shelter_id": body.get("shelter_id", ""),
-            "created_at": current_time,
-            "updated_at": current_time,
-            "is_labrador": "labrador" in body["dog_species"].lower(),
-            "wag_count": 0,
-            "growl_count": 0,
-            "status": "available"
-        }
+        dog_record = build_dog_record(body, utc_now_iso())
         
         print(f"Saving dog record: {dog_record}")
         
         # Save to DynamoDB
-        dogs_table.put_item(Item=dog_record)
+        dynamodb_client.put_item(TableName=DOGS_TABLE, Item=to_dynamodb_item(dog_record))
         
         print("Dog saved successfully")
         
-        # Prepare response
-        response_data = dog_record.copy()
-        response_data["dog_name"] = body["dog_name"]  # Return unencrypted name
-        del response_data["dog_name_encrypted"]
-        
-        return {
-            "statusCode": 201,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": True,
-                "data": {
-                    "message": "Dog successfully added to the system",
-                    **response_data
-                }
-            }, default=str)  # Handle Decimal serialization
-        }
+        return _resp(201, {
+            "success": True,
+            "data": {
+                "message": "Dog successfully added to the system",
+                **to_response_data(dog_record, body["dog_name"])
+            }
+        })
 
     except Exception as e:
         print(f"Error creating dog: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": False,
-                "error": "Internal server error"
-            })
-        }
+        return _resp(500, {
+            "success": False,
+            "error": "Internal server error"
+        })
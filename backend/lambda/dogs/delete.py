@@ -1,15 +1,81 @@
-import json
 import os
-from datetime import datetime
+import time
+from binascii import a2b_base64
+from decimal import Decimal
 import boto3
-import base64
+from botocore.config import Config
+
+
+def _json_default(obj):
+    """Encode DynamoDB Decimals as JSON numbers and anything else as a string"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    return str(obj)
+
+
+try:
+    import orjson
+
+    def _dumps(obj):
+        """Serialize a response body, with Decimals as numbers"""
+        return orjson.dumps(obj, default=_json_default).decode()
+except ImportError:
+    # Fallback for deployments without the shared Lambda layer
+    import json
+
+    def _dumps(obj):
+        """Serialize a response body, with Decimals as numbers"""
+        return json.dumps(obj, default=_json_default)
 
 # Environment variables
 DOGS_TABLE = os.environ.get("DOGS_TABLE", "pupper-dogs")
 
+# Shared response headers (CORS enabled)
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
+    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
+}
+
+# Keep connections alive across warm invocations and back off adaptively
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    max_pool_connections=10,
+    connect_timeout=2,
+)
+
 # AWS clients
-dynamodb = boto3.resource("dynamodb")
-dogs_table = dynamodb.Table(DOGS_TABLE)
+dynamodb_client = boto3.client("dynamodb", config=BOTO_CONFIG)
+
+# Open the DynamoDB connection (DNS, TCP, TLS) during Lambda init rather
+# than on the first request; skipped outside Lambda, e.g. in tests
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    try:
+        dynamodb_client.describe_table(TableName=DOGS_TABLE)
+    except Exception:
+        pass  # Best effort; the first request connects on its own
+
+
+def utc_now_iso():
+    """Current UTC time in ISO 8601 format with a trailing Z"""
+    now_ns = time.time_ns()
+    t = time.gmtime(now_ns // 1_000_000_000)
+    return (
+        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+        f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+        f".{now_ns // 1000 % 1_000_000:06d}Z"
+    )
+
+
+def _resp(status_code, body):
+    """Build an API Gateway proxy response"""
+    return {
+        "statusCode": status_code,
+        "headers": CORS_HEADERS,
+        "body": _dumps(body)
+    }
 
 
 def lambda_handler(event, context):
@@ -23,103 +89,52 @@ def lambda_handler(event, context):
         dog_id = path_parameters.get("dog_id")
         
         if not dog_id:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": False,
-                    "error": "Dog ID is required"
-                })
-            }
+            return _resp(400, {
+                "success": False,
+                "error": "Dog ID is required"
+            })
         
         print(f"Deleting dog: {dog_id}")
         
-        # Get the dog record first to return info
-        try:
-            response = dogs_table.get_item(Key={"dog_id": dog_id})
-            
-            if "Item" not in response:
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Content-Type": "application/json",
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                        "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                    },
-                    "body": json.dumps({
-                        "success": False,
-                        "error": "Dog not found"
-                    })
-                }
-            
-            dog_record = response["Item"]
-            
-            # Get dog name for response
-            dog_name = "Unknown"
-            if "dog_name_encrypted" in dog_record:
-                try:
-                    dog_name = base64.b64decode(dog_record["dog_name_encrypted"]).decode()
-                except:
-                    dog_name = "Unknown"
-            
-        except Exception as e:
-            print(f"Error getting dog record: {str(e)}")
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": False,
-                    "error": "Error retrieving dog record"
-                })
-            }
+        # Delete the dog record, returning the old attributes for the response
+        response = dynamodb_client.delete_item(
+            TableName=DOGS_TABLE,
+            Key={"dog_id": {"S": dog_id}},
+            ReturnValues="ALL_OLD"
+        )
         
-        # Delete the dog record
-        dogs_table.delete_item(Key={"dog_id": dog_id})
+        if "Attributes" not in response:
+            return _resp(404, {
+                "success": False,
+                "error": "Dog not found"
+            })
+        
+        # Only the name is read back, straight from its attribute value
+        dog_record = response["Attributes"]
+        
+        # Get dog name for response
+        dog_name = "Unknown"
+        if "dog_name_encrypted" in dog_record:
+            try:
+                dog_name = a2b_base64(dog_record["dog_name_encrypted"]["S"]).decode()
+            except:
+                dog_name = "Unknown"
         
         print(f"Dog {dog_id} deleted successfully")
         
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": True,
-                "data": {
-                    "message": "Dog successfully deleted from the system",
-                    "dog_id": dog_id,
-                    "dog_name": dog_name,
-                    "deleted_at": datetime.utcnow().isoformat() + "Z"
-                }
-            })
-        }
+        return _resp(200, {
+            "success": True,
+            "data": {
+                "message": "Dog successfully deleted from the system",
+                "dog_id": dog_id,
+                "dog_name": dog_name,
+                "deleted_at": utc_now_iso()
+            }
+        })
 
     except Exception as e:
         print(f"Error deleting dog: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": False,
-                "error": "Internal server error"
-            })
-        }
+        return _resp(500, {
+            "success": False,
+            "error": "Internal server error"
+        })
@@ -1,236 +1,592 @@
-import json
 import os
+import re
+import logging
+from decimal import Decimal
 import boto3
 import base64
-from decimal import Decimal
-from datetime import datetime, timedelta
-import re
+import binascii
+import heapq
+import time
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from datetime import date, datetime, timezone
+from functools import lru_cache, partial
+from itertools import chain
+
+
+def _json_default(obj):
+    """Encode DynamoDB Decimals as JSON numbers and anything else as a string"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    return str(obj)
+
+
+try:
+    import orjson
+
+    def _dumps(obj):
+        """Serialize a response body, with Decimals as numbers"""
+        return orjson.dumps(obj, default=_json_default).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    # Fallback for deployments without the shared Lambda layer
+    import json
+
+    def _dumps(obj):
+        """Serialize a response body, with Decimals as numbers"""
+        return json.dumps(obj, default=_json_default)
+
+    _loads = json.loads
 
 # Environment variables
 DOGS_TABLE = os.environ.get("DOGS_TABLE", "pupper-dogs")
 
-# AWS clients
-dynamodb = boto3.resource("dynamodb")
-dogs_table = dynamodb.Table(DOGS_TABLE)
+# Shared response headers (CORS enabled)
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
+    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
+}
+
+# Lambda's root logger already has a handler; LOG_LEVEL=DEBUG adds the
+# per-request counts
+logger = logging.getLogger()
+try:
+    logger.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+except ValueError:
+    logger.setLevel(logging.INFO)  # Unknown level name; don't fail init
+
+# Keep connections alive across warm invocations and back off adaptively
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    max_pool_connections=10,
+    connect_timeout=2,
+)
+
+# AWS clients. The low-level client loads its service model here, at init,
+# and skips the resource layer's per-item wrapping
+dynamodb_client = boto3.client("dynamodb", config=BOTO_CONFIG)
+_deserialize = TypeDeserializer().deserialize
+
+# GSI on (state, created_at), defined in the CDK stack
+STATE_INDEX = "StateIndex"
+
+# Attributes that identify an item when resuming a table scan or index query;
+# all of them are strings
+TABLE_KEY = ("dog_id",)
+STATE_INDEX_KEY = ("dog_id", "state", "created_at")
+
+# Full-table scans are split into up to SCAN_SEGMENTS segments, read
+# concurrently, with at least SCAN_SEGMENT_MIN_ITEMS dogs per segment
+SCAN_SEGMENTS = int(os.environ.get("SCAN_SEGMENTS", "4"))
+SCAN_SEGMENT_MIN_ITEMS = 500
+
+# DynamoDB refreshes ItemCount about every six hours; re-describe the
+# table after this many seconds so a warm container follows the growth
+ITEM_COUNT_TTL_SECONDS = 3600
+_ITEM_COUNT_CACHE = {"count": None, "expires_at": 0.0}
+
+# Query parameters that control paging rather than filter the results
+PAGING_PARAMETERS = ("page", "limit", "sort_by", "sort_order", "cursor")
+
+# MM/DD/YYYY, accepting the single-digit month/day that strptime's %m/%d allow
+MDY_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})\Z")
+
+# Text fields the free-text search looks in, besides tags
+SEARCH_FIELDS = (
+    "dog_name",
+    "dog_species",
+    "dog_description",
+    "shelter_name",
+    "city",
+    "state",
+    "dog_color",
+    "status",
+)
+
+# Largest page end (page * limit) for which the handler selects the top
+# dogs with a heap instead of sorting every match
+TOP_K_MAX = 200
+
+# Sorts before any real created_at/updated_at
+MIN_TIMESTAMP = datetime.min.replace(tzinfo=timezone.utc)
+
+# (query parameter, dog attribute) pairs matched as case-insensitive substrings
+PARTIAL_MATCH_FILTERS = (
+    ("city", "city"),
+    ("color", "dog_color"),
+    ("species", "dog_species"),
+    ("shelter", "shelter_name"),
+)
+
+# (query parameter, normalization) pairs matched exactly, case-insensitively,
+# against the dog attribute of the same name
+EXACT_MATCH_FILTERS = (
+    ("state", str.upper),
+    ("status", str.lower),
+)
+
+# is_labrador filter values that mean True
+TRUTHY_VALUES = ("true", "1", "yes")
+
+
+def from_dynamodb_item(item):
+    """Unmarshal DynamoDB attribute values into a plain dog dict"""
+    return {name: _deserialize(value) for name, value in item.items()}
+
+
+def build_read_request(query_parameters):
+    """Build the DynamoDB read for a dogs listing
+
+    Returns the client method to page with, its keyword arguments, and the
+    key attributes that identify an item for ExclusiveStartKey.
+    """
+    request = {"TableName": DOGS_TABLE}
+
+    # Exact-match filters DynamoDB can apply before items leave the table;
+    # apply_filters still runs afterwards, so this only has to be a superset
+    if str(query_parameters.get("is_labrador", "")).lower() in TRUTHY_VALUES:
+        request["FilterExpression"] = "is_labrador = :is_labrador"
+        request["ExpressionAttributeValues"] = {":is_labrador": {"BOOL": True}}
+
+    state = query_parameters.get("state")
+    if state:
+        # States are stored upper-cased, newest first matches the default sort.
+        # Age ranges stay in apply_filters: dog_age_years is missing on some
+        # dogs (age then comes from the birthday) and written as a string by
+        # update.py, so an index keyed on it would silently drop matches.
+        request["IndexName"] = STATE_INDEX
+        request["KeyConditionExpression"] = "#state = :state"
+        request["ExpressionAttributeNames"] = {"#state": "state"}  # reserved word
+        request.setdefault("ExpressionAttributeValues", {})[":state"] = {"S": state.upper()}
+        request["ScanIndexForward"] = False
+        return dynamodb_client.query, request, STATE_INDEX_KEY
+
+    return dynamodb_client.scan, request, TABLE_KEY
+
+
+def returns_sorted(query_parameters, sort_by, sort_order):
+    """True when fetch_dogs already yields dogs in the requested order
+
+    A StateIndex query walks created_at newest first, and filtering keeps
+    that order.
+    """
+    return bool(query_parameters.get("state")) and sort_by == "created_at" and sort_order.lower() == "desc"
+
+
+def table_item_count():
+    """DynamoDB's item count estimate for the dogs table
+
+    The count is cached for ITEM_COUNT_TTL_SECONDS, which is plenty for
+    choosing a scan strategy. Returns 0 if the table can't be described;
+    that fallback is not cached, so the next call tries again.
+    """
+    now = time.monotonic()
+    if _ITEM_COUNT_CACHE["count"] is not None and now < _ITEM_COUNT_CACHE["expires_at"]:
+        return _ITEM_COUNT_CACHE["count"]
+
+    try:
+        count = dynamodb_client.describe_table(TableName=DOGS_TABLE)["Table"].get("ItemCount", 0)
+    except (ClientError, BotoCoreError) as e:
+        logger.warning("Could not describe %s: %s", DOGS_TABLE, e)
+        return 0
+
+    _ITEM_COUNT_CACHE["count"] = count
+    _ITEM_COUNT_CACHE["expires_at"] = now + ITEM_COUNT_TTL_SECONDS
+    return count
+
+
+# Open the DynamoDB connection (DNS, TCP, TLS) during Lambda init rather
+# than on the first request, caching the item count on the way; skipped
+# outside Lambda, e.g. in tests
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    try:
+        table_item_count()
+    except Exception:
+        pass  # Best effort; the first request connects on its own
+
+
+def scan_segment_count():
+    """How many parallel segments a full-table scan should use
+
+    Small tables get a single sequential scan; larger ones get more
+    segments as they grow, so the read rate ramps up with the table
+    instead of jumping straight to SCAN_SEGMENTS concurrent scans.
+    """
+    return max(1, min(SCAN_SEGMENTS, table_item_count() // SCAN_SEGMENT_MIN_ITEMS))
+
+
+def read_all(read_page, request):
+    """Follow LastEvaluatedKey until the scan or query is exhausted"""
+    dogs = []
+    while True:
+        response = read_page(**request)
+        dogs.extend(map(from_dynamodb_item, response.get("Items", [])))
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            return dogs
+        request["ExclusiveStartKey"] = last_key
+
+
+def fetch_dogs(query_parameters):
+    """Load every candidate dog, querying the state GSI when a state filter is given"""
+    read_page, request, _ = build_read_request(query_parameters)
 
+    # Large full-table scans are read segment by segment in parallel; boto3
+    # releases the GIL while each thread waits on the network
+    total_segments = 1 if "KeyConditionExpression" in request else scan_segment_count()
+    if total_segments > 1:
+        # Imported here: small tables and index queries never need threads
+        from concurrent.futures import ThreadPoolExecutor
 
+        segments = [dict(request, Segment=segment, TotalSegments=total_segments)
+                    for segment in range(total_segments)]
+        with ThreadPoolExecutor(max_workers=total_segments) as executor:
+            return list(chain.from_iterable(executor.map(partial(read_all, read_page), segments)))
+
+    return read_all(read_page, request)
+
+
+def fetch_dogs_page(query_parameters, limit, start_key=None):
+    """Read only as many items as it takes to fill one filtered page
+
+    Returns the page and the key to resume from, or None when the read is done.
+    Raises ValueError if start_key does not have this listing's key attributes.
+    """
+    read_page, request, key_fields = build_read_request(query_parameters)
+    request["Limit"] = limit
+    if start_key:
+        # e.g. a state listing's cursor replayed without the state filter
+        if set(start_key) != set(key_fields):
+            raise ValueError("Cursor is not for this listing")
+        request["ExclusiveStartKey"] = start_key
+
+    # Only a name search needs names before filtering; the caller decrypts
+    # whatever ends up on the page
+    search_names = bool(query_parameters.get("search"))
+
+    page = []
+    while True:
+        response = read_page(**request)
+        items = [from_dynamodb_item(item) for item in response.get("Items", [])]
+        if search_names:
+            decrypt_dog_names(items)
+        last_key = response.get("LastEvaluatedKey")
+
+        matches = apply_filters(items, query_parameters)
+        for position, dog in enumerate(matches):
+            page.append(dog)
+            if len(page) == limit:
+                if position + 1 < len(matches) or last_key:
+                    return page, {field: {"S": dog[field]} for field in key_fields}
+                return page, None
+
+        if not last_key:
+            return page, None
+        request["ExclusiveStartKey"] = last_key
+
+
+def encode_cursor(start_key):
+    """Opaque, URL-safe cursor for a DynamoDB start key"""
+    return base64.urlsafe_b64encode(_dumps(start_key).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Start key from a cursor, raising ValueError if it is malformed"""
+    start_key = _loads(base64.urlsafe_b64decode(cursor.encode()))
+    if not isinstance(start_key, dict) or not all(
+            isinstance(value, dict) and isinstance(value.get("S"), str)
+            for value in start_key.values()):
+        raise ValueError("Cursor does not encode a key")
+    return start_key
+
+
+def decrypt_dog_names(dogs):
+    """Replace dog_name_encrypted with the decoded dog_name, in place
+
+    Already-decrypted dogs are left alone, so this is safe to call twice.
+    An undecodable name becomes "Unknown" and is never sent back encoded.
+    """
+    for dog in dogs:
+        encrypted = dog.pop("dog_name_encrypted", None)
+        if encrypted is not None:
+            try:
+                dog["dog_name"] = binascii.a2b_base64(encrypted).decode()
+            except (ValueError, TypeError):
+                dog["dog_name"] = "Unknown"
+
+
+@lru_cache(maxsize=4096)
 def parse_date(date_str):
-    """Parse MM/DD/YYYY date format"""
+    """Parse MM/DD/YYYY date format
+
+    Cached: many dogs share dates, and filter bounds repeat for every dog.
+    Callers must treat the returned datetime as read-only.
+    """
     try:
-        return datetime.strptime(date_str, "%m/%d/%Y")
-    except:
+        match = MDY_RE.match(date_str)
+        if not match:
+            return None
+        return datetime(int(match.group(3)), int(match.group(1)), int(match.group(2)))
+    except (ValueError, TypeError):
         return None
 
 
 def calculate_age_from_birthday(birthday_str):
     """Calculate age in years from birthday string"""
     try:
-        birthday = parse_date(birthday_str)
-        if birthday:
-            today = datetime.now()
-            age = today.year - birthday.year
-            if today.month < birthday.month or (today.month == birthday.month and today.day < birthday.day):
-                age -= 1
-            return age
-        return None
-    except:
+        return _age_on(birthday_str, date.today())
+    except TypeError:
+        # Unhashable birthday values cannot go through the cache
         return None
 
 
+@lru_cache(maxsize=4096)
+def _age_on(birthday_str, today):
+    """Whole years from birthday_str to today; keyed on today so a warm
+    container never serves yesterday's ages"""
+    birthday = parse_date(birthday_str)
+    if birthday:
+        age = today.year - birthday.year
+        if today.month < birthday.month or (today.month == birthday.month and today.day < birthday.day):
+            age -= 1
+        return age
+    return None
+
+
+def search_blob(dog):
+    """All searchable text of a dog, lowercased once, one field per line"""
+    parts = [str(dog.get(field, "")) for field in SEARCH_FIELDS]
+    tags = dog.get("tags", [])
+    if isinstance(tags, list):
+        parts.extend(str(tag) for tag in tags)
+    return "\n".join(parts).lower()
+
+
 def matches_search_query(dog, search_query):
     """Check if dog matches search query (case-insensitive partial match)"""
     if not search_query:
         return True
-    
-    search_query = search_query.lower()
-    searchable_fields = [
-        dog.get("dog_name", ""),
-        dog.get("dog_species", ""),
-        dog.get("dog_description", ""),
-        dog.get("shelter_name", ""),
-        dog.get("city", ""),
-        dog.get("state", ""),
-        dog.get("dog_color", ""),
-        str(dog.get("status", ""))
-    ]
-    
-    # Search in all text fields
-    for field in searchable_fields:
-        if search_query in str(field).lower():
+    return search_query.lower() in search_blob(dog)
+
+
+def _parse_bound(value, convert):
+    """Convert a filter bound once, or None if it is missing or invalid"""
+    if not value:
+        return None
+    try:
+        return convert(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _range_predicate(get_value, low, high, convert):
+    """Predicate rejecting dogs outside [low, high]; unreadable values pass"""
+    def in_range(dog):
+        value = get_value(dog)
+        if value is None:
             return True
-    
-    # Search in tags if they exist
-    tags = dog.get("tags", [])
-    if isinstance(tags, list):
-        for tag in tags:
-            if search_query in str(tag).lower():
-                return True
-    
-    return False
+        try:
+            value = convert(value)
+        except (ValueError, TypeError):
+            return True
+        if low is not None and value < low:
+            return False
+        if high is not None and value > high:
+            return False
+        return True
+    return in_range
+
+
+def _dog_age(dog):
+    """Stored age, falling back to one derived from the birthday"""
+    dog_age = dog.get("dog_age_years")
+    if dog_age is None and dog.get("dog_birthday"):
+        dog_age = calculate_age_from_birthday(dog.get("dog_birthday"))
+    return dog_age
+
+
+# (min query parameter, max query parameter, dog value, conversion) for
+# numeric range filters; a None parameter leaves that side open
+RANGE_FILTERS = (
+    ("min_weight", "max_weight", lambda dog: dog.get("dog_weight"), float),
+    ("min_age", "max_age", _dog_age, float),
+    ("min_wag_count", None, lambda dog: dog.get("wag_count", 0), int),
+    (None, "max_growl_count", lambda dog: dog.get("growl_count", 0), int),
+)
+
+
+def compile_filters(filters):
+    """Turn query filters into a list of dog predicates
+
+    Filter values are normalized and parsed once here rather than once per
+    dog inside the filtering loop.
+    """
+    predicates = []
+
+    if filters.get("search"):
+        search = filters["search"].lower()
+        predicates.append(lambda dog: search in search_blob(dog))
+
+    # Exact, case-insensitive matches
+    for filter_key, normalize in EXACT_MATCH_FILTERS:
+        if filters.get(filter_key):
+            wanted = normalize(filters[filter_key])
+            predicates.append(
+                lambda dog, wanted=wanted, key=filter_key, normalize=normalize: normalize(dog.get(key, "")) == wanted
+            )
+
+    # Partial, case-insensitive matches
+    for filter_key, dog_key in PARTIAL_MATCH_FILTERS:
+        if filters.get(filter_key):
+            needle = filters[filter_key].lower()
+            predicates.append(
+                lambda dog, needle=needle, dog_key=dog_key: needle in dog.get(dog_key, "").lower()
+            )
+
+    # Numeric ranges
+    for min_key, max_key, get_value, convert in RANGE_FILTERS:
+        low = _parse_bound(filters.get(min_key), convert)
+        high = _parse_bound(filters.get(max_key), convert)
+        if low is not None or high is not None:
+            predicates.append(_range_predicate(get_value, low, high, convert))
+
+    # Date range filters
+    from_date = parse_date(filters["entry_date_from"]) if filters.get("entry_date_from") else None
+    to_date = parse_date(filters["entry_date_to"]) if filters.get("entry_date_to") else None
+    if from_date or to_date:
+        predicates.append(_range_predicate(
+            lambda dog: parse_date(dog.get("shelter_entry_date", "")), from_date, to_date, lambda value: value
+        ))
+
+    # Boolean filters
+    if filters.get("is_labrador") is not None:
+        is_labrador = filters["is_labrador"].lower() in TRUTHY_VALUES
+        predicates.append(lambda dog: dog.get("is_labrador", False) == is_labrador)
+
+    # Tags filter (if dog has tags)
+    if filters.get("tags"):
+        filter_tags = frozenset(tag.strip().lower() for tag in filters["tags"].split(",")) - {""}
+
+        def has_tag(dog):
+            return not filter_tags.isdisjoint(str(tag).lower() for tag in dog.get("tags", ()))
+
+        if filter_tags:
+            predicates.append(has_tag)
+
+    return predicates
 
 
 def apply_filters(dogs, filters):
     """Apply filters to the dogs list"""
-    filtered_dogs = []
-    
-    for dog in dogs:
-        # Skip if doesn't match search query
-        if not matches_search_query(dog, filters.get("search")):
-            continue
-        
-        # State filter
-        if filters.get("state") and dog.get("state", "").upper() != filters["state"].upper():
-            continue
-        
-        # City filter (partial match)
-        if filters.get("city") and filters["city"].lower() not in dog.get("city", "").lower():
-            continue
-        
-        # Weight filters
-        dog_weight = dog.get("dog_weight")
-        if dog_weight is not None:
-            if filters.get("min_weight"):
-                try:
-                    if float(dog_weight) < float(filters["min_weight"]):
-                        continue
-                except (ValueError, TypeError):
-                    pass
-            
-            if filters.get("max_weight"):
-                try:
-                    if float(dog_weight) > float(filters["max_weight"]):
-                        continue
-                except (ValueError, TypeError):
-                    pass
-        
-        # Age filters
-        dog_age = dog.get("dog_age_years")
-        if dog_age is None and dog.get("dog_birthday"):
-            dog_age = calculate_age_from_birthday(dog.get("dog_birthday"))
-        
-        if dog_age is not None:
-            if filters.get("min_age"):
-                try:
-                    if float(dog_age) < float(filters["min_age"]):
-                        continue
-                except (ValueError, TypeError):
-                    pass
-            
-            if filters.get("max_age"):
-                try:
-                    if float(dog_age) > float(filters["max_age"]):
-                        continue
-                except (ValueError, TypeError):
-                    pass
-        
-        # Color filter (partial match)
-        if filters.get("color") and filters["color"].lower() not in dog.get("dog_color", "").lower():
-            continue
-        
-        # Status filter
-        if filters.get("status") and dog.get("status", "").lower() != filters["status"].lower():
-            continue
-        
-        # Species filter (partial match)
-        if filters.get("species") and filters["species"].lower() not in dog.get("dog_species", "").lower():
-            continue
-        
-        # Shelter filter (partial match)
-        if filters.get("shelter") and filters["shelter"].lower() not in dog.get("shelter_name", "").lower():
-            continue
-        
-        # Date range filters
-        if filters.get("entry_date_from") or filters.get("entry_date_to"):
-            entry_date = parse_date(dog.get("shelter_entry_date", ""))
-            if entry_date:
-                if filters.get("entry_date_from"):
-                    from_date = parse_date(filters["entry_date_from"])
-                    if from_date and entry_date < from_date:
-                        continue
-                
-                if filters.get("entry_date_to"):
-                    to_date = parse_date(filters["entry_date_to"])
-                    if to_date and entry_date > to_date:
-                        continue
-        
-        # Vote count filters
-        if filters.get("min_wag_count"):
-            try:
-                if int(dog.get("wag_count", 0)) < int(filters["min_wag_count"]):
-                    continue
-            except (ValueError, TypeError):
-                pass
-        
-        if filters.get("max_growl_count"):
-            try:
-                if int(dog.get("growl_count", 0)) > int(filters["max_growl_count"]):
-                    continue
-            except (ValueError, TypeError):
-                pass
-        
-        # Boolean filters
-        if filters.get("is_labrador") is not None:
-            is_lab_filter = filters["is_labrador"].lower() in ["true", "1", "yes"]
-            if dog.get("is_labrador", False) != is_lab_filter:
-                continue
-        
-        # Tags filter (if dog has tags)
-        if filters.get("tags"):
-            filter_tags = [tag.strip().lower() for tag in filters["tags"].split(",")]
-            dog_tags = [str(tag).lower() for tag in dog.get("tags", [])]
-            if not any(tag in " ".join(dog_tags) for tag in filter_tags):
-                continue
-        
-        filtered_dogs.append(dog)
-    
-    return filtered_dogs
+    predicates = compile_filters(filters)
+    if not predicates:
+        return list(dogs)
+    return [dog for dog in dogs if all(predicate(dog) for predicate in predicates)]
+
+
+def _numeric_sort_key(field):
+    def key(dog):
+        value = dog.get(field)
+        try:
+            return float(value) if value is not None else 0
+        except (ValueError, TypeError):
+            return 0
+    return key
+
+
+def _date_sort_key(field):
+    def key(dog):
+        value = dog.get(field)
+        date_obj = parse_date(str(value)) if value else None
+        return date_obj if date_obj else datetime.min
+    return key
+
+
+def _timestamp_sort_key(field):
+    def key(dog):
+        value = dog.get(field)
+        if not value:
+            return MIN_TIMESTAMP
+        try:
+            timestamp = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return MIN_TIMESTAMP
+        # Naive and aware datetimes do not compare; stored timestamps are UTC
+        return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+    return key
+
+
+def _text_sort_key(field):
+    def key(dog):
+        value = dog.get(field)
+        return str(value).lower() if value else ""
+    return key
+
+
+# Sort key factory per sortable field; anything else sorts as text
+SORT_KEY_FACTORIES = {
+    "dog_weight": _numeric_sort_key,
+    "dog_age_years": _numeric_sort_key,
+    "wag_count": _numeric_sort_key,
+    "growl_count": _numeric_sort_key,
+    "shelter_entry_date": _date_sort_key,
+    "dog_birthday": _date_sort_key,
+    "created_at": _timestamp_sort_key,
+    "updated_at": _timestamp_sort_key,
+}
+
 
+def sort_dogs(dogs, sort_by, sort_order="asc", top=None):
+    """Sort dogs by specified field
 
-def sort_dogs(dogs, sort_by, sort_order="asc"):
-    """Sort dogs by specified field"""
+    With top, only the first top dogs of that order are returned, selected
+    with a heap in O(n log top) instead of sorting the whole list.
+    """
     if not sort_by:
         return dogs
     
     reverse = sort_order.lower() == "desc"
     
-    def get_sort_key(dog):
-        value = dog.get(sort_by)
-        
-        # Handle different data types
-        if sort_by in ["dog_weight", "dog_age_years", "wag_count", "growl_count"]:
-            try:
-                return float(value) if value is not None else 0
-            except (ValueError, TypeError):
-                return 0
-        
-        elif sort_by in ["created_at", "updated_at", "shelter_entry_date", "dog_birthday"]:
-            if sort_by in ["shelter_entry_date", "dog_birthday"]:
-                date_obj = parse_date(str(value)) if value else None
-                return date_obj if date_obj else datetime.min
-            else:
-                try:
-                    return datetime.fromisoformat(str(value).replace('Z', '+00:00')) if value else datetime.min
-                except:
-                    return datetime.min
-        
-        else:
-            return str(value).lower() if value else ""
+    # Resolve the key function once; sorted() then computes each dog's key
+    # exactly once and keeps equal keys in their original order
+    get_sort_key = SORT_KEY_FACTORIES.get(sort_by, _text_sort_key)(sort_by)
     
     try:
+        if top is not None and top < len(dogs):
+            # Same result and tie order as sorted(...)[:top]
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            return select(top, dogs, key=get_sort_key)
         return sorted(dogs, key=get_sort_key, reverse=reverse)
     except Exception as e:
-        print(f"Error sorting dogs: {e}")
+        logger.warning("Error sorting dogs by %s: %s", sort_by, e)
         return dogs
 
 
-def paginate_results(dogs, page=1, limit=20):
-    """Paginate results"""
+def parse_paging(page=1, limit=20):
+    """Validate page and limit, falling back to the first page of 20"""
     try:
         page = max(1, int(page))
         limit = min(100, max(1, int(limit)))  # Max 100 items per page
     except (ValueError, TypeError):
         page = 1
         limit = 20
+    return page, limit
+
+
+def paginate_results(dogs, page=1, limit=20, total_items=None):
+    """Paginate results
+
+    total_items is the number of matching dogs when dogs holds only the
+    leading ones (see sort_dogs' top); it defaults to len(dogs).
+    """
+    page, limit = parse_paging(page, limit)
+    if total_items is None:
+        total_items = len(dogs)
     
     start_idx = (page - 1) * limit
     end_idx = start_idx + limit
@@ -240,144 +596,154 @@ def paginate_results(dogs, page=1, limit=20):
         "pagination": {
             "current_page": page,
             "per_page": limit,
-            "total_items": len(dogs),
-            "total_pages": (len(dogs) + limit - 1) // limit,
-            "has_next": end_idx < len(dogs),
+            "total_items": total_items,
+            "total_pages": (total_items + limit - 1) // limit,
+            "has_next": end_idx < total_items,
             "has_prev": page > 1
         }
     }
 
 
+def _resp(status_code, body):
+    """Build an API Gateway proxy response"""
+    return {
+        "statusCode": status_code,
+        "headers": CORS_HEADERS,
+        "body": _dumps(body)
+    }
+
+
 def lambda_handler(event, context):
     """Enhanced Lambda handler for reading dogs with advanced search and filtering"""
     
     try:
-        print("Processing read dog request")
-        
         # Check if this is a single dog request
         path_parameters = event.get("pathParameters") or {}
         dog_id = path_parameters.get("dog_id")
         
         if dog_id:
             # Get single dog
-            print(f"Getting single dog: {dog_id}")
-            response = dogs_table.get_item(Key={"dog_id": dog_id})
+            logger.debug("Getting single dog: %s", dog_id)
+            response = dynamodb_client.get_item(TableName=DOGS_TABLE, Key={"dog_id": {"S": dog_id}})
             
             if "Item" not in response:
-                return {
-                    "statusCode": 404,
-                    "headers": {
-                        "Content-Type": "application/json",
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                        "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                    },
-                    "body": json.dumps({
-                        "success": False,
-                        "error": "Dog not found"
-                    })
-                }
+                return _resp(404, {
+                    "success": False,
+                    "error": "Dog not found"
+                })
             
-            dog = response["Item"]
+            dog = from_dynamodb_item(response["Item"])
             
             # Decrypt dog name
-            if "dog_name_encrypted" in dog:
-                try:
-                    dog["dog_name"] = base64.b64decode(dog["dog_name_encrypted"]).decode()
-                    del dog["dog_name_encrypted"]
-                except:
-                    dog["dog_name"] = "Unknown"
+            decrypt_dog_names((dog,))
             
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": True,
-                    "message": "Dog retrieved successfully",
-                    "data": dog
-                }, default=str)
-            }
+            return _resp(200, {
+                "success": True,
+                "message": "Dog retrieved successfully",
+                "data": dog
+            })
         
         else:
             # Get all dogs with advanced filtering
-            print("Getting dogs with advanced filtering")
-            
-            # Get query parameters
             query_parameters = event.get("queryStringParameters") or {}
             
-            # Scan all dogs
-            response = dogs_table.scan()
-            dogs = response.get("Items", [])
+            applied_filters = {k: v for k, v in query_parameters.items()
+                               if k not in PAGING_PARAMETERS}
             
-            # Decrypt dog names
-            for dog in dogs:
-                if "dog_name_encrypted" in dog:
-                    try:
-                        dog["dog_name"] = base64.b64decode(dog["dog_name_encrypted"]).decode()
-                        del dog["dog_name_encrypted"]
-                    except:
-                        dog["dog_name"] = "Unknown"
+            # Cursor paging reads just enough of the table for one page, in
+            # DynamoDB order (newest first with a state filter)
+            if "cursor" in query_parameters:
+                try:
+                    limit = min(100, max(1, int(query_parameters.get("limit", 20))))
+                except (ValueError, TypeError):
+                    limit = 20
+                
+                try:
+                    cursor = query_parameters["cursor"]
+                    start_key = decode_cursor(cursor) if cursor else None
+                    dogs, next_key = fetch_dogs_page(query_parameters, limit, start_key)
+                except ValueError:
+                    return _resp(400, {
+                        "success": False,
+                        "error": "Invalid cursor"
+                    })
+                except ClientError as e:
+                    # DynamoDB rejects a start key whose values do not fit the
+                    # table, e.g. from a tampered cursor
+                    if not start_key or e.response["Error"]["Code"] != "ValidationException":
+                        raise
+                    return _resp(400, {
+                        "success": False,
+                        "error": "Invalid cursor"
+                    })
+                
+                decrypt_dog_names(dogs)
+                next_cursor = encode_cursor(next_key) if next_key else None
+                
+                return _resp(200, {
+                    "success": True,
+                    "message": "Dogs retrieved successfully",
+                    "data": {
+                        "dogs": dogs,
+                        "pagination": {
+                            "per_page": limit,
+                            "next_cursor": next_cursor,
+                            "has_next": next_cursor is not None
+                        },
+                        "filters_applied": applied_filters
+                    }
+                })
+            
+            # Load dogs, narrowed server-side where an index or filter allows
+            dogs = fetch_dogs(query_parameters)
+            logger.debug("Found %d total dogs before filtering", len(dogs))
+            
+            sort_by = query_parameters.get("sort_by", "created_at")
+            sort_order = query_parameters.get("sort_order", "desc")
             
-            print(f"Found {len(dogs)} total dogs before filtering")
+            # Names are only needed for every dog when searching or sorting
+            # by them; otherwise only the returned page is decrypted
+            if query_parameters.get("search") or sort_by == "dog_name":
+                decrypt_dog_names(dogs)
             
             # Apply filters
             filtered_dogs = apply_filters(dogs, query_parameters)
-            print(f"Found {len(filtered_dogs)} dogs after filtering")
+            logger.debug("Found %d dogs after filtering", len(filtered_dogs))
             
-            # Sort results
-            sort_by = query_parameters.get("sort_by", "created_at")
-            sort_order = query_parameters.get("sort_order", "desc")
-            sorted_dogs = sort_dogs(filtered_dogs, sort_by, sort_order)
+            page, limit = parse_paging(query_parameters.get("page", 1),
+                                       query_parameters.get("limit", 20))
             
-            # Paginate results
-            page = query_parameters.get("page", 1)
-            limit = query_parameters.get("limit", 20)
-            paginated_result = paginate_results(sorted_dogs, page, limit)
+            # Sort results, unless the index already returned them in order.
+            # Only the dogs up to the end of the requested page need ordering.
+            if returns_sorted(query_parameters, sort_by, sort_order):
+                sorted_dogs = filtered_dogs
+            else:
+                top = page * limit
+                sorted_dogs = sort_dogs(filtered_dogs, sort_by, sort_order,
+                                        top=top if top <= TOP_K_MAX else None)
             
-            # Prepare response
-            applied_filters = {k: v for k, v in query_parameters.items() 
-                             if k not in ["page", "limit", "sort_by", "sort_order"]}
+            # Paginate results
+            paginated_result = paginate_results(sorted_dogs, page, limit,
+                                                total_items=len(filtered_dogs))
+            decrypt_dog_names(paginated_result["dogs"])
             
-            return {
-                "statusCode": 200,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": True,
-                    "message": "Dogs retrieved successfully",
-                    "data": {
-                        "dogs": paginated_result["dogs"],
-                        "pagination": paginated_result["pagination"],
-                        "filters_applied": applied_filters,
-                        "sort": {
-                            "sort_by": sort_by,
-                            "sort_order": sort_order
-                        }
+            return _resp(200, {
+                "success": True,
+                "message": "Dogs retrieved successfully",
+                "data": {
+                    "dogs": paginated_result["dogs"],
+                    "pagination": paginated_result["pagination"],
+                    "filters_applied": applied_filters,
+                    "sort": {
+                        "sort_by": sort_by,
+                        "sort_order": sort_order
                     }
-                }, default=str)
-            }
+                }
+            })
 
     except Exception as e:
-        print(f"Error reading dogs: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": False,
-                "error": "Internal server error"
-            })
-        }
+        logger.exception("Error reading dogs: %s", e)
+        return _resp(500, {
+            "success": False,
+            "error": "Internal server error"
+        })
@@ -1,16 +1,114 @@
-import json
 import os
-from datetime import datetime
+import time
+from datetime import date
+from functools import lru_cache
+from binascii import b2a_base64
+from decimal import Decimal
 import boto3
-import base64
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+
+def _json_default(obj):
+    """Encode DynamoDB Decimals as JSON numbers and anything else as a string"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    return str(obj)
+
+
+try:
+    import orjson
+
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def _dumps(obj):
+        """Serialize a response body, with Decimals as numbers"""
+        return orjson.dumps(obj, default=_json_default).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    # Fallback for deployments without the shared Lambda layer
+    import json
+
+    JSONDecodeError = json.JSONDecodeError
+
+    def _dumps(obj):
+        """Serialize a response body, with Decimals as numbers"""
+        return json.dumps(obj, default=_json_default)
+
+    _loads = json.loads
 
 # Environment variables
 DOGS_TABLE = os.environ.get("DOGS_TABLE", "pupper-dogs")
 VOTES_TABLE = os.environ.get("VOTES_TABLE", "pupper-votes")
 
-# AWS clients
-dynamodb = boto3.resource("dynamodb")
-dogs_table = dynamodb.Table(DOGS_TABLE)
+# Shared response headers (CORS enabled)
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
+    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
+}
+
+# Keep connections alive across warm invocations and back off adaptively
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    max_pool_connections=10,
+    connect_timeout=2,
+)
+
+# AWS clients. The low-level client skips the resource layer's per-item
+# wrapping; values are (un)marshalled explicitly where needed
+dynamodb_client = boto3.client("dynamodb", config=BOTO_CONFIG)
+_serialize = TypeSerializer().serialize
+_deserialize = TypeDeserializer().deserialize
+
+# Open the DynamoDB connection (DNS, TCP, TLS) during Lambda init rather
+# than on the first request; skipped outside Lambda, e.g. in tests
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    try:
+        dynamodb_client.describe_table(TableName=DOGS_TABLE)
+    except Exception:
+        pass  # Best effort; the first request connects on its own
+
+
+def _resp(status_code, body):
+    """Build an API Gateway proxy response"""
+    return {
+        "statusCode": status_code,
+        "headers": CORS_HEADERS,
+        "body": _dumps(body)
+    }
+
+
+def from_dynamodb_item(item):
+    """Unmarshal DynamoDB attribute values into a plain dog dict"""
+    return {name: _deserialize(value) for name, value in item.items()}
+
+
+def utc_now_iso():
+    """Current UTC time in ISO 8601 format with a trailing Z"""
+    now_ns = time.time_ns()
+    t = time.gmtime(now_ns // 1_000_000_000)
+    return (
+        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+        f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+        f".{now_ns // 1000 % 1_000_000:06d}Z"
+    )
+
+
+def parse_mdy(date_str):
+    """Parse an MM/DD/YYYY date without going through strptime"""
+    month, day, year = date_str.split("/")
+    return date(int(year), int(month), int(day))
+
+
+@lru_cache(maxsize=1024)
+def calculate_age_years(birthday_str, today):
+    """Age in years, to one decimal, on the given day"""
+    return round((today - parse_mdy(birthday_str)).days / 365.25, 1)
 
 
 def lambda_handler(event, context):
@@ -24,346 +122,269 @@ def lambda_handler(event, context):
         dog_id = path_parameters.get("dog_id")
         
         if not dog_id:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": False,
-                    "error": "Dog ID is required"
-                })
-            }
+            return _resp(400, {
+                "success": False,
+                "error": "Dog ID is required"
+            })
         
         # Parse request body
         if not event.get("body"):
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": False,
-                    "error": "Request body is required"
-                })
-            }
+            return _resp(400, {
+                "success": False,
+                "error": "Request body is required"
+            })
         
-        body = json.loads(event["body"])
+        body = _loads(event["body"])
         print(f"Update request: {body}")
         
+        # One timestamp for everything this request writes and echoes back
+        now_iso = utc_now_iso()
+        
         # Check if this is a vote request
         if "vote_type" in body and "user_id" in body:
-            return handle_vote(dog_id, body)
+            return handle_vote(dog_id, body, now_iso)
         else:
             # Regular dog update
-            return handle_dog_update(dog_id, body)
+            return handle_dog_update(dog_id, body, now_iso)
 
-    except json.JSONDecodeError as e:
+    except JSONDecodeError as e:
         print(f"JSON decode error: {str(e)}")
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": False,
-                "error": "Invalid JSON in request body"
-            })
-        }
+        return _resp(400, {
+            "success": False,
+            "error": "Invalid JSON in request body"
+        })
 
     except Exception as e:
         print(f"Error updating dog: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": False,
-                "error": "Internal server error"
-            })
-        }
+        return _resp(500, {
+            "success": False,
+            "error": "Internal server error"
+        })
+
+
+def vote_transaction(dog_id, user_id, vote_type, previous_vote, now_iso):
+    """
+    TransactItems recording a user's vote in place of previous_vote (None
+    for a first vote): the vote row and the dog's counts change together
+    or not at all, so a failed write can be retried without double counting
+    """
+    vote_values = {":vote_type": {"S": vote_type}, ":now": {"S": now_iso}}
+    counts_expression = f"ADD {vote_type}_count :inc"
+    counts_values = {":inc": {"N": "1"}}
+    
+    if previous_vote is None:
+        vote_condition = "attribute_not_exists(vote_type)"
+    else:
+        # A switched vote moves one count across
+        vote_condition = "vote_type = :previous"
+        vote_values[":previous"] = {"S": previous_vote}
+        counts_expression += f", {previous_vote}_count :dec"
+        counts_values[":dec"] = {"N": "-1"}
+    
+    return [
+        {"Update": {
+            "TableName": VOTES_TABLE,
+            "Key": {"user_id": {"S": user_id}, "dog_id": {"S": dog_id}},
+            "UpdateExpression": "SET vote_type = :vote_type, updated_at = :now, created_at = if_not_exists(created_at, :now)",
+            "ConditionExpression": vote_condition,
+            "ExpressionAttributeValues": vote_values
+        }},
+        # The condition keeps a vote on a missing dog from creating a bare
+        # dog record, and cancels the vote row write along with it
+        {"Update": {
+            "TableName": DOGS_TABLE,
+            "Key": {"dog_id": {"S": dog_id}},
+            "UpdateExpression": counts_expression,
+            "ConditionExpression": "attribute_exists(dog_id)",
+            "ExpressionAttributeValues": counts_values
+        }}
+    ]
 
 
-def handle_vote(dog_id, body):
+def handle_vote(dog_id, body, now_iso):
     """Handle voting on a dog"""
     vote_type = body["vote_type"]
     user_id = body["user_id"]
     
     if vote_type not in ["wag", "growl"]:
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": False,
-                "error": "Vote type must be 'wag' or 'growl'"
-            })
-        }
+        return _resp(400, {
+            "success": False,
+            "error": "Vote type must be 'wag' or 'growl'"
+        })
+    
+    if not isinstance(user_id, str) or not user_id:
+        return _resp(400, {
+            "success": False,
+            "error": "User ID must be a non-empty string"
+        })
     
     print(f"Recording {vote_type} vote for dog {dog_id} by user {user_id}")
     
-    # Update dog's vote counts
-    if vote_type == "wag":
-        dogs_table.update_item(
-            Key={"dog_id": dog_id},
-            UpdateExpression="ADD wag_count :inc",
-            ExpressionAttributeValues={":inc": 1}
-        )
-    else:
-        dogs_table.update_item(
-            Key={"dog_id": dog_id},
-            UpdateExpression="ADD growl_count :inc",
-            ExpressionAttributeValues={":inc": 1}
-        )
+    # Try the vote as a first vote, then as a switch from the other vote
+    # type. Each attempt is conditioned on what the vote row held, so only
+    # the matching one writes; a repeat of the same vote matches neither
+    # and changes nothing
+    for previous_vote in (None, "growl" if vote_type == "wag" else "wag"):
+        try:
+            dynamodb_client.transact_write_items(
+                TransactItems=vote_transaction(dog_id, user_id, vote_type, previous_vote, now_iso)
+            )
+            break
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "TransactionCanceledException":
+                raise
+            vote_reason, dog_reason = (
+                reason.get("Code") for reason in e.response["CancellationReasons"]
+            )
+            if dog_reason == "ConditionalCheckFailed":
+                return _resp(404, {
+                    "success": False,
+                    "error": "Dog not found"
+                })
+            if vote_reason != "ConditionalCheckFailed":
+                raise
     
     vote_type_display = "wag" if vote_type == "wag" else "growl"
     
-    return {
-        "statusCode": 200,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-            "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-        },
-        "body": json.dumps({
-            "success": True,
-            "data": {
-                "message": f"Successfully recorded {vote_type_display} for dog",
-                "dog_id": dog_id,
-                "user_id": user_id,
-                "vote_type": vote_type,
-                "timestamp": datetime.utcnow().isoformat() + "Z"
-            }
-        })
-    }
+    return _resp(200, {
+        "success": True,
+        "data": {
+            "message": f"Successfully recorded {vote_type_display} for dog",
+            "dog_id": dog_id,
+            "user_id": user_id,
+            "vote_type": vote_type,
+            "timestamp": now_iso
+        }
+    })
 
 
-def handle_dog_update(dog_id, body):
+def _encrypt_name(value):
+    """Encrypt dog name (simple base64 for now)"""
+    return b2a_base64(value.encode(), newline=False).decode("ascii")
+
+
+def _check_species(value):
+    """Validate species (only Labrador Retrievers allowed)"""
+    if "Labrador" not in value:
+        raise ValueError("Only Labrador Retrievers are allowed")
+    return value
+
+
+def _normalize_weight(value):
+    """Weight as a string, for DynamoDB consistency"""
+    try:
+        return str(float(value))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid weight value")
+
+
+# Updatable request field -> (stored attribute, transform applied to
+# non-empty values). A transform raising ValueError rejects the request
+# with its message.
+UPDATABLE_FIELDS = {
+    "shelter_name": ("shelter_name", None),
+    "city": ("city", None),
+    "state": ("state", str.upper),
+    "dog_name": ("dog_name_encrypted", _encrypt_name),  # Note: we encrypt dog names
+    "dog_species": ("dog_species", _check_species),
+    "shelter_entry_date": ("shelter_entry_date", None),
+    "dog_description": ("dog_description", None),
+    "dog_birthday": ("dog_birthday", None),
+    "dog_weight": ("dog_weight", _normalize_weight),
+    "dog_color": ("dog_color", str.lower),
+    "dog_photo_url": ("dog_photo_url", None),
+    "status": ("status", None),
+}
+
+
+def handle_dog_update(dog_id, body, now_iso):
     """Handle updating dog information"""
     
-    # First, check if the dog exists
-    try:
-        response = dogs_table.get_item(Key={"dog_id": dog_id})
-        if "Item" not in response:
-            return {
-                "statusCode": 404,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
+    # Stored attribute -> new value, built in one pass over the request
+    updates = {}
+    for field, value in body.items():
+        if field not in UPDATABLE_FIELDS:
+            continue
+        attribute, transform = UPDATABLE_FIELDS[field]
+        if transform and value:
+            try:
+                value = transform(value)
+            except ValueError as e:
+                return _resp(400, {
                     "success": False,
-                    "error": "Dog not found"
+                    "error": str(e)
                 })
-            }
-        
-        existing_dog = response["Item"]
-        
-    except Exception as e:
-        print(f"Error fetching dog: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": False,
-                "error": "Error fetching dog information"
-            })
-        }
-    
-    # Prepare update expression and values
-    update_expression_parts = []
-    expression_attribute_values = {}
-    expression_attribute_names = {}
-    
-    # Updatable fields
-    updatable_fields = {
-        "shelter_name": "shelter_name",
-        "city": "city", 
-        "state": "state",
-        "dog_name": "dog_name_encrypted",  # Note: we encrypt dog names
-        "dog_species": "dog_species",
-        "shelter_entry_date": "shelter_entry_date",
-        "dog_description": "dog_description",
-        "dog_birthday": "dog_birthday",
-        "dog_weight": "dog_weight",
-        "dog_color": "dog_color",
-        "dog_photo_url": "dog_photo_url",
-        "status": "status"
-    }
-    
-    # Process each field in the request
-    for field, db_field in updatable_fields.items():
-        if field in body:
-            value = body[field]
-            
-            # Special handling for different fields
-            if field == "dog_name" and value:
-                # Encrypt dog name (simple base64 for now)
-                value = base64.b64encode(value.encode()).decode()
-            elif field == "dog_species" and value:
-                # Validate species (only Labrador Retrievers allowed)
-                if "Labrador" not in value:
-                    return {
-                        "statusCode": 400,
-                        "headers": {
-                            "Content-Type": "application/json",
-                            "Access-Control-Allow-Origin": "*",
-                            "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                            "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                        },
-                        "body": json.dumps({
-                            "success": False,
-                            "error": "Only Labrador Retrievers are allowed"
-                        })
-                    }
-            elif field == "dog_color" and value:
-                value = value.lower()
-            elif field == "state" and value:
-                value = value.upper()
-            elif field == "dog_weight" and value:
-                try:
-                    value = str(float(value))  # Convert to string for DynamoDB consistency
-                except:
-                    return {
-                        "statusCode": 400,
-                        "headers": {
-                            "Content-Type": "application/json",
-                            "Access-Control-Allow-Origin": "*",
-                            "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                            "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                        },
-                        "body": json.dumps({
-                            "success": False,
-                            "error": "Invalid weight value"
-                        })
-                    }
-            
-            # Add to update expression
-            attr_name = f"#{db_field}"
-            attr_value = f":{db_field}"
-            
-            update_expression_parts.append(f"{attr_name} = {attr_value}")
-            expression_attribute_names[attr_name] = db_field
-            expression_attribute_values[attr_value] = value
+        updates[attribute] = value
     
     # Always update the updated_at timestamp
-    update_expression_parts.append("#updated_at = :updated_at")
-    expression_attribute_names["#updated_at"] = "updated_at"
-    expression_attribute_values[":updated_at"] = datetime.utcnow().isoformat() + "Z"
+    updates["updated_at"] = now_iso
     
     # Recalculate age if birthday was updated
     if "dog_birthday" in body:
         try:
-            birthday_str = body["dog_birthday"]
-            birthday = datetime.strptime(birthday_str, "%m/%d/%Y")
-            age_years = (datetime.now() - birthday).days / 365.25
-            
-            update_expression_parts.append("#dog_age_years = :dog_age_years")
-            expression_attribute_names["#dog_age_years"] = "dog_age_years"
-            expression_attribute_values[":dog_age_years"] = f"{age_years:.1f}"
+            age_years = calculate_age_years(body["dog_birthday"], date.today())
+            updates["dog_age_years"] = f"{age_years:.1f}"
         except Exception as e:
             print(f"Error calculating age: {str(e)}")
             pass  # If age calculation fails, skip it
     
     # Update is_labrador flag if species was updated
     if "dog_species" in body:
-        is_labrador = "Labrador" in body["dog_species"]
-        update_expression_parts.append("#is_labrador = :is_labrador")
-        expression_attribute_names["#is_labrador"] = "is_labrador"
-        expression_attribute_values[":is_labrador"] = is_labrador
+        updates["is_labrador"] = "Labrador" in body["dog_species"]
     
-    if not update_expression_parts:
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": False,
-                "error": "No valid fields to update"
-            })
-        }
+    if not updates:
+        return _resp(400, {
+            "success": False,
+            "error": "No valid fields to update"
+        })
     
-    # Perform the update
+    # Perform the update; the condition makes a missing dog fail the write
+    # instead of creating it, so no separate existence check is needed
     try:
-        update_expression = "SET " + ", ".join(update_expression_parts)
+        update_expression = "SET " + ", ".join(f"#{name} = :{name}" for name in updates)
         
         print(f"Updating dog {dog_id} with expression: {update_expression}")
         
-        response = dogs_table.update_item(
-            Key={"dog_id": dog_id},
+        response = dynamodb_client.update_item(
+            TableName=DOGS_TABLE,
+            Key={"dog_id": {"S": dog_id}},
             UpdateExpression=update_expression,
-            ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=expression_attribute_values,
-            ReturnValues="ALL_NEW"
+            ExpressionAttributeNames={f"#{name}": name for name in updates},
+            ExpressionAttributeValues={f":{name}": _serialize(value) for name, value in updates.items()},
+            ConditionExpression="attribute_exists(dog_id)",
+            ReturnValues="UPDATED_NEW"
         )
         
-        updated_dog = response["Attributes"]
+        # Only the changed attributes come back; the caller already has the rest
+        updated_dog = {"dog_id": dog_id, **from_dynamodb_item(response["Attributes"])}
         
-        # Decrypt dog name for response
-        if "dog_name_encrypted" in updated_dog:
-            try:
-                updated_dog["dog_name"] = base64.b64decode(updated_dog["dog_name_encrypted"]).decode()
-            except:
-                updated_dog["dog_name"] = "Unknown"
+        # Echo the plain dog name the caller sent rather than decoding it back
+        if updated_dog.pop("dog_name_encrypted", None) is not None:
+            updated_dog["dog_name"] = body["dog_name"]
         
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": True,
-                "data": {
-                    "message": "Dog updated successfully",
-                    **{k: (str(v) if hasattr(v, '__str__') else v) for k, v in updated_dog.items()}
-                }
-            })  # Remove default=str to avoid serialization issues
-        }
+        return _resp(200, {
+            "success": True,
+            "data": {
+                "message": "Dog updated successfully",
+                **{k: (str(v) if hasattr(v, '__str__') else v) for k, v in updated_dog.items()}
+            }
+        })
         
-    except Exception as e:
-        print(f"Error updating dog in database: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+            return _resp(404, {
                 "success": False,
-                "error": "Failed to update dog in database"
+                "error": "Dog not found"
             })
-        }
+        print(f"Error updating dog in database: {str(e)}")
+        return _resp(500, {
+            "success": False,
+            "error": "Failed to update dog in database"
+        })
+        
+    except Exception as e:
+        print(f"Error updating dog in database: {str(e)}")
+        return _resp(500, {
+            "success": False,
+            "error": "Failed to update dog in database"
+        })
@@ -1,14 +1,29 @@
-import json
 import os
+import re
+from binascii import a2b_base64
+from concurrent.futures import Future, ThreadPoolExecutor
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Dict, List, Tuple
+from typing import Dict
+
+# Keep connections alive across warm invocations and back off adaptively
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    max_pool_connections=10,
+    connect_timeout=2,
+)
 
 # AWS clients
-rekognition = boto3.client("rekognition")
-s3 = boto3.client("s3")
+rekognition = boto3.client("rekognition", config=BOTO_CONFIG)
+
+# Rekognition calls are I/O bound, so label and text detection run side by side
+rekognition_executor = ThreadPoolExecutor(max_workers=2)
 
 # Configuration
+DEBUG_LOGGING = bool(os.environ.get("DEBUG"))
+MAX_INLINE_IMAGE_SIZE = 5 * 1024 * 1024  # Rekognition limit for raw image bytes
 CONFIDENCE_THRESHOLD = 70.0  # Minimum confidence for dog detection
 LABRADOR_KEYWORDS = [
     "labrador retriever",
@@ -18,13 +33,21 @@ LABRADOR_KEYWORDS = [
     "retriever"
 ]
 
-def classify_image_content(bucket: str, key: str) -> Dict:
+# Single-pass matcher over LABRADOR_KEYWORDS; word boundaries keep "lab" from
+# matching unrelated labels such as "Label" or "Laboratory"
+LABRADOR_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(keyword) for keyword in LABRADOR_KEYWORDS) + r")s?\b"
+)
+
+def classify_image_content(bucket: str, key: str, image_bytes: bytes = None) -> Dict:
     """
     Use Amazon Rekognition to classify image content and detect if it contains a Labrador Retriever
     
     Args:
         bucket: S3 bucket name
         key: S3 object key
+        image_bytes: Image content; when small enough it is sent to Rekognition
+            directly instead of having Rekognition fetch the S3 object
         
     Returns:
         Dict containing classification results
@@ -32,50 +55,64 @@ def classify_image_content(bucket: str, key: str) -> Dict:
     try:
         print(f"Starting image classification for s3://{bucket}/{key}")
         
-        # Detect labels in the image
-        response = rekognition.detect_labels(
-            Image={
+        if image_bytes and len(image_bytes) <= MAX_INLINE_IMAGE_SIZE:
+            image = {'Bytes': image_bytes}
+        else:
+            image = {
                 'S3Object': {
                     'Bucket': bucket,
                     'Name': key
                 }
-            },
+            }
+        
+        # Detect labels and text in parallel; text detection backs up breed matching
+        labels_future = rekognition_executor.submit(
+            rekognition.detect_labels,
+            Image=image,
             MaxLabels=50,
             MinConfidence=CONFIDENCE_THRESHOLD
         )
+        text_future = rekognition_executor.submit(rekognition.detect_text, Image=image)
+        
+        response = labels_future.result()
         
         labels = response.get('Labels', [])
-        print(f"Detected {len(labels)} labels with confidence >= {CONFIDENCE_THRESHOLD}%")
         
-        # Check for dog-related labels
+        # Sort labels into all/dog/Labrador buckets in a single pass
+        all_labels = []
         dog_labels = []
         labrador_labels = []
         
         for label in labels:
-            label_name = label['Name'].lower()
+            name = label['Name']
+            label_name = name.lower()
             confidence = label['Confidence']
+            label_summary = {
+                'name': name,
+                'confidence': confidence
+            }
+            all_labels.append(label_summary)
             
-            print(f"Label: {label['Name']} (Confidence: {confidence:.2f}%)")
+            if DEBUG_LOGGING:
+                print(f"Label: {name} (Confidence: {confidence:.2f}%)")
             
             # Check if it's a dog
             if 'dog' in label_name:
-                dog_labels.append({
-                    'name': label['Name'],
-                    'confidence': confidence
-                })
+                dog_labels.append(label_summary)
             
             # Check if it's specifically a Labrador or related breed
-            for keyword in LABRADOR_KEYWORDS:
-                if keyword in label_name:
-                    labrador_labels.append({
-                        'name': label['Name'],
-                        'confidence': confidence,
-                        'keyword_match': keyword
-                    })
-                    break
+            keyword_match = LABRADOR_PATTERN.search(label_name)
+            if keyword_match:
+                labrador_labels.append({
+                    'name': name,
+                    'confidence': confidence,
+                    'keyword_match': keyword_match.group(1)
+                })
         
-        # Additional check using detect_custom_labels for more specific breed detection
-        breed_info = detect_dog_breed(bucket, key)
+        print(f"labels={len(labels)} dog={len(dog_labels)} lab={len(labrador_labels)}")
+        
+        # Additional check using text detection for more specific breed detection
+        breed_info = detect_dog_breed(text_future)
         
         # Determine if image is acceptable
         is_labrador = len(labrador_labels) > 0
@@ -97,7 +134,7 @@ def classify_image_content(bucket: str, key: str) -> Dict:
             'confidence_score': max([label['confidence'] for label in labrador_labels], default=0),
             'dog_labels': dog_labels,
             'labrador_labels': labrador_labels,
-            'all_labels': [{'name': label['Name'], 'confidence': label['Confidence']} for label in labels],
+            'all_labels': all_labels,
             'breed_detection': breed_info,
             'classification_timestamp': response['ResponseMetadata']['HTTPHeaders']['date']
         }
@@ -145,27 +182,19 @@ def classify_image_content(bucket: str, key: str) -> Dict:
             'error_code': 'SERVICE_ERROR'
         }
 
-def detect_dog_breed(bucket: str, key: str) -> Dict:
+def detect_dog_breed(text_future: Future) -> Dict:
     """
     Additional breed detection using text detection and object analysis
     
     Args:
-        bucket: S3 bucket name
-        key: S3 object key
+        text_future: Pending Rekognition detect_text call for the image
         
     Returns:
         Dict containing breed detection results
     """
     try:
         # Use detect_text to see if there are any breed indicators in the image
-        text_response = rekognition.detect_text(
-            Image={
-                'S3Object': {
-                    'Bucket': bucket,
-                    'Name': key
-                }
-            }
-        )
+        text_response = text_future.result()
         
         detected_text = []
         for text_detection in text_response.get('TextDetections', []):
@@ -173,10 +202,7 @@ def detect_dog_breed(bucket: str, key: str) -> Dict:
                 detected_text.append(text_detection['DetectedText'].lower())
         
         # Check if any detected text mentions Labrador
-        text_mentions_labrador = any(
-            keyword in ' '.join(detected_text) 
-            for keyword in LABRADOR_KEYWORDS
-        )
+        text_mentions_labrador = LABRADOR_PATTERN.search(' '.join(detected_text)) is not None
         
         return {
             'detected_text': detected_text,
@@ -202,7 +228,8 @@ def lambda_handler(event, context):
     Expected event format:
     {
         "bucket": "bucket-name",
-        "key": "path/to/image.jpg"
+        "key": "path/to/image.jpg",
+        "image_data": "<optional base64 image content>"
     }
     """
     try:
@@ -222,8 +249,11 @@ def lambda_handler(event, context):
                 }
             }
         
+        image_data = event.get('image_data')
+        image_bytes = a2b_base64(image_data) if image_data else None
+        
         # Perform classification
-        classification_result = classify_image_content(bucket, key)
+        classification_result = classify_image_content(bucket, key, image_bytes)
         
         # Return result
         return {
@@ -245,17 +275,3 @@ def lambda_handler(event, context):
                 'is_acceptable': False
             }
         }
-
-# Helper function for testing
-def test_classification():
-    """Test function for local development"""
-    test_event = {
-        'bucket': 'pupper-images-test',
-        'key': 'uploads/test-image.jpg'
-    }
-    
-    result = lambda_handler(test_event, None)
-    print(json.dumps(result, indent=2))
-
-if __name__ == "__main__":
-    test_classification()
@@ -4,24 +4,59 @@ Creates 400x400 and 50x50 versions of uploaded images
 Handles large images (>10MB) with optimized processing
 """
 
-import json
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Tuple
 import boto3
 from PIL import Image, ImageOps
 import io
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        """Serialize a response body"""
+        return orjson.dumps(obj, default=str).decode()
+
+except ImportError:
+    # Fallback for deployments without the shared Lambda layer
+    import json
+
+    def _dumps(obj):
+        """Serialize a response body"""
+        return json.dumps(obj, default=str)
+
+
+try:
+    import numpy as np
+    from turbojpeg import TJPF_RGB, TJSAMP_420, TurboJPEG
+
+    # The layer ships libturbojpeg under /opt/lib, which PyTurboJPEG does
+    # not search on its own
+    _turbo_jpeg = TurboJPEG(
+        os.environ.get("TURBOJPEG_LIB_PATH", "/opt/lib/libturbojpeg.so.0")
+    )
+except (ImportError, OSError, RuntimeError):
+    # Fallback to PIL's own JPEG codec without libjpeg-turbo in the layer
+    _turbo_jpeg = None
+
+
 # Add the backend directory to the path to import utilities
 sys.path.append("/opt/python")
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
 
 try:
     from utils.logger import get_lambda_logger, log_s3_operation
-    from utils.tracing import trace_lambda_handler, trace_s3_operation
+    from utils.tracing import (
+        bind_trace_context,
+        trace_lambda_handler,
+        trace_s3_operation,
+    )
 except ImportError:
     # Fallback for when modules are not available
     def get_lambda_logger(context):
@@ -34,6 +69,9 @@ except ImportError:
     ):
         pass
 
+    def bind_trace_context(func):
+        return func
+
     def trace_lambda_handler(func):
         return func
 
@@ -44,15 +82,26 @@ except ImportError:
         return decorator
 
 
+# Keep connections alive across warm invocations; the pool covers the
+# resized versions uploading concurrently
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    max_pool_connections=10,
+)
+
 # Initialize AWS clients
-s3_client = boto3.client("s3")
-dynamodb = boto3.resource("dynamodb")
+s3_client = boto3.client("s3", config=BOTO_CONFIG)
+dynamodb = boto3.resource("dynamodb", config=BOTO_CONFIG)
 
 # Get environment variables
 IMAGES_BUCKET = os.environ.get("IMAGES_BUCKET", "pupper-images")
 DOGS_TABLE = os.environ.get("DOGS_TABLE", "pupper-dogs")
 IMAGES_TABLE = os.environ.get("IMAGES_TABLE", "pupper-images")
 
+# Table handle reused across warm invocations
+images_table = dynamodb.Table(IMAGES_TABLE)
+
 # Image processing configuration
 RESIZE_CONFIGS = [
     {"name": "400x400", "size": (400, 400), "quality": 85, "format": "PNG"},
@@ -71,6 +120,26 @@ RESIZE_CONFIGS = [
     },  # Thumbnail
 ]
 
+# EXIF orientation -> transpose that makes the image upright, as applied by
+# ImageOps.exif_transpose
+EXIF_ORIENTATION_TAG = 0x0112
+EXIF_TRANSPOSES = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+# Every version is resampled from an intermediate at least this many times
+# its size; the intermediate is a cheap box reduction of the original
+REDUCING_GAP = 2
+
+# Scale-down factors libjpeg can apply while decoding a JPEG, largest first
+JPEG_DCT_SCALES = (8, 4, 2)
+
 # Memory optimization settings
 MAX_PIXELS = 50000000  # 50MP limit to prevent memory issues
 CHUNK_SIZE = 8192  # For streaming large files
@@ -103,7 +172,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         )
         return {
             "statusCode": 500,
-            "body": json.dumps(
+            "body": _dumps(
                 {"success": False, "error": f"Image processing failed: {str(e)}"}
             ),
         }
@@ -156,7 +225,7 @@ def process_s3_events(records: list, logger) -> Dict[str, Any]:
 
     return {
         "statusCode": 200,
-        "body": json.dumps(
+        "body": _dumps(
             {
                 "success": True,
                 "message": f"Processed {processed_count} images, {failed_count} failed",
@@ -175,7 +244,7 @@ def process_direct_invocation(event: Dict[str, Any], logger) -> Dict[str, Any]:
     if not image_id:
         return {
             "statusCode": 400,
-            "body": json.dumps(
+            "body": _dumps(
                 {
                     "success": False,
                     "error": "image_id is required for direct invocation",
@@ -192,7 +261,7 @@ def process_direct_invocation(event: Dict[str, Any], logger) -> Dict[str, Any]:
 
     status_code = 200 if result["success"] else 500
 
-    return {"statusCode": status_code, "body": json.dumps(result)}
+    return {"statusCode": status_code, "body": _dumps(result)}
 
 
 def process_image_from_s3(
@@ -204,11 +273,19 @@ def process_image_from_s3(
             "Starting image processing", image_id=image_id, bucket=bucket, key=key
         )
 
-        # Update processing status
-        update_processing_status(image_id, "processing", logger)
+        # Mark the image as processing while it downloads; leaving the block
+        # waits for that write, so later status updates cannot be overtaken
+        with ThreadPoolExecutor(max_workers=1) as status_executor:
+            status_executor.submit(
+                bind_trace_context(update_processing_status),
+                image_id,
+                "processing",
+                logger,
+            )
+
+            # Download and validate image
+            image_data = download_image_from_s3(bucket, key, logger)
 
-        # Download and validate image
-        image_data = download_image_from_s3(bucket, key, logger)
         if not image_data["success"]:
             update_processing_status(image_id, "failed", logger, image_data["error"])
             return image_data
@@ -225,7 +302,7 @@ def process_image_from_s3(
             )
 
             if update_result["success"]:
-                update_processing_status(image_id, "completed", logger)
+                # The metadata update already set processing_status to completed
                 logger.info(
                     "Image processing completed successfully", image_id=image_id
                 )
@@ -342,22 +419,35 @@ def process_image_data(
 
         # Open and validate the image
         try:
+            # Image.open only parses the header, so oversized images are
+            # rejected before their pixels are decoded
             image = Image.open(io.BytesIO(image_data))
 
-            # Auto-orient image based on EXIF data
-            image = ImageOps.exif_transpose(image)
+            # Check image size limits
+            total_pixels = image.width * image.height
+            if total_pixels > MAX_PIXELS:
+                error_msg = (
+                    f"Image too large: {total_pixels} pixels (max: {MAX_PIXELS})"
+                )
+                logger.error("Image size error", error=error_msg, image_id=image_id)
+                return {"success": False, "error": error_msg}
+
+            # Taken from the header: decoding may already scale the image down
+            original_dimensions = image.size
+
+            image = decode_oriented_image(image, image_data)
 
             # Convert to RGB if necessary (handles RGBA, CMYK, etc.)
             if image.mode not in ("RGB", "L"):
-                if image.mode == "RGBA":
+                if image.mode == "RGBA" and image.getextrema()[3][0] < 255:
                     # Create white background for transparent images
                     background = Image.new("RGB", image.size, (255, 255, 255))
                     background.paste(image, mask=image.split()[-1])
                     image = background
                 else:
+                    # Includes fully opaque RGBA, where dropping alpha is enough
                     image = image.convert("RGB")
 
-            original_dimensions = image.size
             logger.info(
                 "Image opened successfully",
                 image_id=image_id,
@@ -370,19 +460,24 @@ def process_image_data(
             logger.error("Image open error", error=error_msg, image_id=image_id)
             return {"success": False, "error": error_msg}
 
-        # Check image size limits
-        total_pixels = original_dimensions[0] * original_dimensions[1]
-        if total_pixels > MAX_PIXELS:
-            error_msg = f"Image too large: {total_pixels} pixels (max: {MAX_PIXELS})"
-            logger.error("Image size error", error=error_msg, image_id=image_id)
-            return {"success": False, "error": error_msg}
+        # Shrink very large originals once, so each version's LANCZOS pass
+        # reads a small intermediate rather than the full image
+        image = reduce_for_resizing(image, RESIZE_CONFIGS)
 
-        # Process each resize configuration
+        # Process each resize configuration concurrently: resizing and
+        # encoding release the GIL, and the S3 uploads are I/O bound
         processing_results = []
+        create_version = bind_trace_context(create_resized_version)
+
+        with ThreadPoolExecutor(max_workers=len(RESIZE_CONFIGS)) as executor:
+            futures = [
+                executor.submit(create_version, image, image_id, config, logger)
+                for config in RESIZE_CONFIGS
+            ]
 
-        for config in RESIZE_CONFIGS:
+        for config, future in zip(RESIZE_CONFIGS, futures):
             try:
-                result = create_resized_version(image, image_id, config, logger)
+                result = future.result()
 
                 if result["success"]:
                     processing_results.append(result)
@@ -433,6 +528,87 @@ def process_image_data(
         return {"success": False, "error": error_msg}
 
 
+def reduction_factor(size: Tuple[int, int], configs: list) -> int:
+    """
+    Largest integer factor an image of the given size can shrink by while
+    staying at least REDUCING_GAP times the size of every resized version
+    """
+    width, height = size
+    largest_scale = max(
+        min(config["size"][0] / width, config["size"][1] / height) for config in configs
+    )
+    return int(1 / (REDUCING_GAP * largest_scale))
+
+
+def reduce_for_resizing(image: Image.Image, configs: list) -> Image.Image:
+    """
+    Box-reduce an image by its reduction factor, if it can shrink at all
+    """
+    factor = reduction_factor(image.size, configs)
+    if factor < 2:
+        return image
+    return image.reduce(factor)
+
+
+def decode_oriented_image(image: Image.Image, image_data: bytes) -> Image.Image:
+    """
+    Decode an opened image and auto-orient it based on EXIF data
+    JPEGs are scaled down while decoding as far as the resized versions
+    allow, and RGB JPEGs are decoded with libjpeg-turbo when it is available
+    """
+    if image.format != "JPEG":
+        return ImageOps.exif_transpose(image)
+
+    # The EXIF orientation may swap width and height, so allow for both
+    factor = min(
+        reduction_factor(image.size, RESIZE_CONFIGS),
+        reduction_factor(image.size[::-1], RESIZE_CONFIGS),
+    )
+    dct_scale = next((scale for scale in JPEG_DCT_SCALES if scale <= factor), 1)
+
+    if _turbo_jpeg is None or image.mode != "RGB":
+        if dct_scale > 1:
+            # Draft mode makes libjpeg skip the DCT work for the dropped detail
+            image.draft(
+                image.mode, (image.width // dct_scale, image.height // dct_scale)
+            )
+        return ImageOps.exif_transpose(image)
+
+    # Image.open only read the header; take the orientation from it and
+    # let libjpeg-turbo decode the pixels
+    orientation = image.getexif().get(EXIF_ORIENTATION_TAG, 1)
+    image = Image.fromarray(
+        _turbo_jpeg.decode(
+            image_data, pixel_format=TJPF_RGB, scaling_factor=(1, dct_scale)
+        )
+    )
+    if orientation in EXIF_TRANSPOSES:
+        image = image.transpose(EXIF_TRANSPOSES[orientation])
+    return image
+
+
+def encode_image(image: Image.Image, config: dict) -> bytes:
+    """Encode a resized image in the configured format"""
+    if config["format"] == "JPEG" and _turbo_jpeg is not None:
+        # Standard Huffman tables: skipping PIL's optimize pass costs a few
+        # percent of file size and saves a second pass over the image
+        return _turbo_jpeg.encode(
+            np.asarray(image),
+            quality=config["quality"],
+            pixel_format=TJPF_RGB,
+            jpeg_subsample=TJSAMP_420,
+        )
+
+    img_buffer = io.BytesIO()
+    save_kwargs = {"format": config["format"], "optimize": True}
+
+    if config["format"] == "JPEG":
+        save_kwargs["quality"] = config["quality"]
+
+    image.save(img_buffer, **save_kwargs)
+    return img_buffer.getvalue()
+
+
 def create_resized_version(
     image: Image.Image, image_id: str, config: dict, logger
 ) -> Dict[str, Any]:
@@ -443,35 +619,20 @@ def create_resized_version(
 
         # Convert to appropriate format
         if config["format"] == "PNG":
-            output_format = "PNG"
             file_extension = "png"
         else:
-            output_format = "JPEG"
             file_extension = "jpg"
             # Ensure RGB mode for JPEG
             if resized_image.mode != "RGB":
                 resized_image = resized_image.convert("RGB")
 
-        # Save to bytes buffer
-        img_buffer = io.BytesIO()
-        save_kwargs = {"format": output_format}
-
-        if output_format == "JPEG":
-            save_kwargs["quality"] = config["quality"]
-            save_kwargs["optimize"] = True
-        elif output_format == "PNG":
-            save_kwargs["optimize"] = True
-
-        resized_image.save(img_buffer, **save_kwargs)
-        img_buffer.seek(0)
+        image_bytes = encode_image(resized_image, config)
 
         # Generate S3 key
         s3_key = f"processed/{image_id}/{config['name']}.{file_extension}"
 
         # Upload to S3
-        upload_result = upload_resized_image(
-            img_buffer.getvalue(), s3_key, config, logger
-        )
+        upload_result = upload_resized_image(image_bytes, s3_key, config, logger)
 
         if upload_result["success"]:
             return {
@@ -481,7 +642,7 @@ def create_resized_version(
                 "url": f"https://{IMAGES_BUCKET}.s3.amazonaws.com/{s3_key}",
                 "size": config["size"],
                 "format": config["format"],
-                "file_size_bytes": len(img_buffer.getvalue()),
+                "file_size_bytes": len(image_bytes),
             }
         else:
             return upload_result
@@ -516,6 +677,14 @@ def resize_image_with_padding(
     # Resize the image
     resized_image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
 
+    # Same aspect ratio as the target: nothing to pad
+    if (new_width, new_height) == (target_width, target_height):
+        return (
+            resized_image
+            if resized_image.mode == "RGB"
+            else resized_image.convert("RGB")
+        )
+
     # Create final image with target size and white background
     final_image = Image.new("RGB", target_size, (255, 255, 255))
 
@@ -586,8 +755,6 @@ def update_processing_status(
 ) -> None:
     """Update image processing status in DynamoDB"""
     try:
-        images_table = dynamodb.Table(IMAGES_TABLE)
-
         update_expression = "SET processing_status = :status, updated_at = :updated_at"
         expression_values = {
             ":status": status,
@@ -634,8 +801,6 @@ def update_image_metadata_with_results(
             }
 
         # Update DynamoDB record
-        images_table = dynamodb.Table(IMAGES_TABLE)
-
         images_table.update_item(
             Key={"image_id": image_id},
             UpdateExpression="""
@@ -669,7 +834,6 @@ def update_image_metadata_with_results(
 def get_image_metadata(image_id: str, logger) -> Dict[str, Any]:
     """Get image metadata from DynamoDB"""
     try:
-        images_table = dynamodb.Table(IMAGES_TABLE)
         response = images_table.get_item(Key={"image_id": image_id})
 
         if "Item" not in response:
@@ -1,20 +1,79 @@
-import json
 import os
-import uuid
-import base64
-from datetime import datetime
+import time
+from binascii import a2b_base64, b2a_base64
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+try:
+    import orjson
+
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def _dumps(obj):
+        """Serialize a response body, stringifying Decimals"""
+        return orjson.dumps(obj, default=str).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    # Fallback for deployments without the shared Lambda layer
+    import json
+
+    JSONDecodeError = json.JSONDecodeError
+
+    def _dumps(obj):
+        """Serialize a response body, stringifying Decimals"""
+        return json.dumps(obj, default=str)
+
+    _loads = json.loads
+
 # Environment variables
 IMAGES_BUCKET = os.environ.get("IMAGES_BUCKET", "pupper-images-380141752789-us-east-1")
 IMAGES_TABLE = os.environ.get("IMAGES_TABLE", "pupper-images")
 CLASSIFICATION_FUNCTION = os.environ.get("CLASSIFICATION_FUNCTION", "")
 
+# Largest accepted decoded image (50MB)
+MAX_IMAGE_SIZE = 50 * 1024 * 1024
+
+# Images up to this size are sent inline to the classifier so Rekognition can skip
+# the S3 fetch; base64 inflation keeps the invoke payload under Lambda's 6MB limit
+INLINE_CLASSIFICATION_MAX_SIZE = 4 * 1024 * 1024
+
+# Accepted upload content types and the extension each is stored under
+FILE_EXTENSIONS = {
+    "image/jpeg": "jpeg",
+    "image/jpg": "jpeg",
+    "image/png": "png",
+    "image/webp": "webp"
+}
+ALLOWED_CONTENT_TYPES = tuple(FILE_EXTENSIONS)
+
+# Public URL for an object key in the images bucket
+IMAGE_URL_TEMPLATE = f"https://{IMAGES_BUCKET}.s3.amazonaws.com/{{key}}"
+
+# Shared response headers (CORS enabled)
+CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
+    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
+}
+
+# Keep connections alive across warm invocations and back off adaptively
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    max_pool_connections=10,
+    connect_timeout=2,
+)
+
+# Uploads go over HTTPS, so skip SHA-256 hashing of multi-MB bodies for SigV4
+S3_CONFIG = BOTO_CONFIG.merge(Config(s3={"payload_signing_enabled": False}))
+
 # AWS clients
-s3 = boto3.client("s3")
-dynamodb = boto3.resource("dynamodb")
-lambda_client = boto3.client("lambda")
+s3 = boto3.client("s3", config=S3_CONFIG)
+dynamodb = boto3.resource("dynamodb", config=BOTO_CONFIG)
+lambda_client = boto3.client("lambda", config=BOTO_CONFIG)
 
 # Try to get the images table, create basic structure if it doesn't exist
 try:
@@ -23,13 +82,53 @@ except:
     images_table = None
 
 
-def classify_uploaded_image(bucket: str, key: str) -> dict:
+def utc_now_iso():
+    """Current UTC time in ISO 8601 format with a trailing Z"""
+    now_ns = time.time_ns()
+    t = time.gmtime(now_ns // 1_000_000_000)
+    return (
+        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+        f"T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+        f".{now_ns // 1000 % 1_000_000:06d}Z"
+    )
+
+
+def new_sortable_id():
+    """
+    Time-ordered 128-bit ID (ULID layout, hex encoded): 48-bit millisecond
+    timestamp followed by 80 random bits
+    """
+    return f"{time.time_ns() // 1_000_000:012x}{os.urandom(10).hex()}"
+
+
+def _resp(status_code, body):
+    """Build an API Gateway proxy response"""
+    return {
+        "statusCode": status_code,
+        "headers": CORS_HEADERS,
+        "body": _dumps(body)
+    }
+
+
+def sniff_image_type(image_bytes: bytes):
+    """Identify JPEG, PNG or WebP data from its magic bytes"""
+    if image_bytes.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if image_bytes.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def classify_uploaded_image(bucket: str, key: str, image_bytes: bytes = None) -> dict:
     """
     Invoke the image classification Lambda function to check if image contains a Labrador Retriever
     
     Args:
         bucket: S3 bucket name
         key: S3 object key
+        image_bytes: Decoded image, sent inline when small enough
         
     Returns:
         Classification result dictionary
@@ -50,16 +149,18 @@ def classify_uploaded_image(bucket: str, key: str) -> dict:
             'bucket': bucket,
             'key': key
         }
+        if image_bytes is not None and len(image_bytes) <= INLINE_CLASSIFICATION_MAX_SIZE:
+            payload['image_data'] = b2a_base64(image_bytes, newline=False).decode("ascii")
         
         # Invoke the classification Lambda function
         response = lambda_client.invoke(
             FunctionName=CLASSIFICATION_FUNCTION,
             InvocationType='RequestResponse',
-            Payload=json.dumps(payload)
+            Payload=_dumps(payload)
         )
         
         # Parse the response
-        response_payload = json.loads(response['Payload'].read())
+        response_payload = _loads(response['Payload'].read())
         
         if response['StatusCode'] == 200:
             classification_body = response_payload.get('body', {})
@@ -89,6 +190,16 @@ def classify_uploaded_image(bucket: str, key: str) -> dict:
         }
 
 
+def save_image_metadata(image_record: dict) -> None:
+    """Store image metadata in DynamoDB, logging rather than raising on failure"""
+    try:
+        images_table.put_item(Item=image_record)
+        print("Image metadata saved to DynamoDB")
+    except Exception as e:
+        print(f"Warning: Could not save to DynamoDB: {str(e)}")
+        # Continue anyway - the image is uploaded to S3
+
+
 def lambda_handler(event, context):
     """Lambda handler for uploading images"""
     
@@ -97,38 +208,20 @@ def lambda_handler(event, context):
         
         # Parse request body
         if not event.get("body"):
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": False,
-                    "error": "Request body is required"
-                })
-            }
+            return _resp(400, {
+                "success": False,
+                "error": "Request body is required"
+            })
         
-        body = json.loads(event["body"])
+        body = _loads(event["body"])
         print(f"Upload request received")
         
         # Validate required fields
         if not body.get("image_data"):
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": False,
-                    "error": "image_data is required"
-                })
-            }
+            return _resp(400, {
+                "success": False,
+                "error": "image_data is required"
+            })
         
         # Get image data and metadata
         image_data = body["image_data"]
@@ -137,70 +230,48 @@ def lambda_handler(event, context):
         description = body.get("description", "")
         
         # Validate content type
-        allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/webp"]
-        if content_type not in allowed_types:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": False,
-                    "error": f"Content type must be one of: {', '.join(allowed_types)}"
-                })
-            }
-        
-        # Generate unique image ID and key
-        image_id = str(uuid.uuid4())
-        file_extension = content_type.split("/")[1]
-        if file_extension == "jpg":
-            file_extension = "jpeg"
-        
-        s3_key = f"uploads/{image_id}/original.{file_extension}"
+        if content_type not in ALLOWED_CONTENT_TYPES:
+            return _resp(400, {
+                "success": False,
+                "error": f"Content type must be one of: {', '.join(ALLOWED_CONTENT_TYPES)}"
+            })
         
         try:
-            # Decode base64 image data
-            if "," in image_data:
-                # Remove data URL prefix if present (data:image/jpeg;base64,...)
-                image_data = image_data.split(",")[1]
+            # Skip the data URL prefix if present (data:image/jpeg;base64,...)
+            # via a memoryview slice rather than copying the payload string
+            encoded = memoryview(image_data.encode("ascii"))[image_data.find(",") + 1:]
             
-            image_bytes = base64.b64decode(image_data)
+            # Validate image size (max 50MB) before paying for the decode
+            estimated_size = len(encoded) * 3 // 4
+            if estimated_size > MAX_IMAGE_SIZE:
+                return _resp(400, {
+                    "success": False,
+                    "error": f"Image size ({estimated_size} bytes) exceeds maximum allowed size (50MB)"
+                })
             
-            # Validate image size (max 50MB)
-            max_size = 50 * 1024 * 1024  # 50MB
-            if len(image_bytes) > max_size:
-                return {
-                    "statusCode": 400,
-                    "headers": {
-                        "Content-Type": "application/json",
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                        "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                    },
-                    "body": json.dumps({
-                        "success": False,
-                        "error": f"Image size ({len(image_bytes)} bytes) exceeds maximum allowed size (50MB)"
-                    })
-                }
+            image_bytes = a2b_base64(encoded)
             
         except Exception as e:
             print(f"Error decoding image data: {str(e)}")
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": False,
-                    "error": "Invalid image data format"
-                })
-            }
+            return _resp(400, {
+                "success": False,
+                "error": "Invalid image data format"
+            })
+        
+        # Reject anything that is not actually a JPEG, PNG or WebP before touching S3,
+        # and trust the sniffed type over the client-supplied one
+        sniffed_type = sniff_image_type(image_bytes)
+        if sniffed_type is None:
+            return _resp(400, {
+                "success": False,
+                "error": "Image data is not a valid JPEG, PNG, or WebP image"
+            })
+        content_type = sniffed_type
+        
+        # Generate unique image ID and key
+        image_id = new_sortable_id()
+        s3_key = f"uploads/{image_id}/original.{FILE_EXTENSIONS[content_type]}"
+        current_time = utc_now_iso()
         
         # Upload to S3
         try:
@@ -213,35 +284,26 @@ def lambda_handler(event, context):
                 Metadata={
                     "image_id": image_id,
                     "dog_id": dog_id,
-                    "uploaded_at": datetime.utcnow().isoformat(),
+                    "uploaded_at": current_time,
                     "original_size": str(len(image_bytes))
                 }
             )
             
             # Generate the public URL
-            original_url = f"https://{IMAGES_BUCKET}.s3.amazonaws.com/{s3_key}"
+            original_url = IMAGE_URL_TEMPLATE.format(key=s3_key)
             
             print(f"Image uploaded successfully: {original_url}")
             
         except ClientError as e:
             print(f"Error uploading to S3: {str(e)}")
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": False,
-                    "error": "Failed to upload image to storage"
-                })
-            }
+            return _resp(500, {
+                "success": False,
+                "error": "Failed to upload image to storage"
+            })
         
         # Classify the uploaded image using Amazon Rekognition
         print("Starting image classification...")
-        classification_result = classify_uploaded_image(IMAGES_BUCKET, s3_key)
+        classification_result = classify_uploaded_image(IMAGES_BUCKET, s3_key, image_bytes)
         
         # Check if image is acceptable (contains Labrador Retriever)
         if not classification_result.get('is_acceptable', False):
@@ -256,31 +318,21 @@ def lambda_handler(event, context):
             error_message = classification_result.get('error', 
                 'Only images of Labrador Retrievers are allowed. Please upload an image containing a Labrador Retriever.')
             
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                    "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-                },
-                "body": json.dumps({
-                    "success": False,
-                    "error": error_message,
-                    "error_code": classification_result.get('error_code', 'NOT_LABRADOR'),
-                    "classification_details": {
-                        "is_dog": classification_result.get('is_dog', False),
-                        "is_labrador": classification_result.get('is_labrador', False),
-                        "confidence_score": classification_result.get('confidence_score', 0),
-                        "detected_labels": classification_result.get('dog_labels', [])
-                    }
-                })
-            }
+            return _resp(400, {
+                "success": False,
+                "error": error_message,
+                "error_code": classification_result.get('error_code', 'NOT_LABRADOR'),
+                "classification_details": {
+                    "is_dog": classification_result.get('is_dog', False),
+                    "is_labrador": classification_result.get('is_labrador', False),
+                    "confidence_score": classification_result.get('confidence_score', 0),
+                    "detected_labels": classification_result.get('dog_labels', [])
+                }
+            })
         
         print(f"Image classification passed - Labrador detected with confidence: {classification_result.get('confidence_score', 0):.2f}%")
         
         # Store metadata in DynamoDB (if table exists)
-        current_time = datetime.utcnow().isoformat() + "Z"
         image_record = {
             "image_id": image_id,
             "dog_id": dog_id,
@@ -304,70 +356,40 @@ def lambda_handler(event, context):
         }
         
         if images_table:
-            try:
-                images_table.put_item(Item=image_record)
-                print("Image metadata saved to DynamoDB")
-            except Exception as e:
-                print(f"Warning: Could not save to DynamoDB: {str(e)}")
-                # Continue anyway - the image is uploaded to S3
+            # Written before responding: the resize Lambda updates this same
+            # item, and a write left for later could overwrite its results
+            save_image_metadata(image_record)
         
         # Return success response
-        return {
-            "statusCode": 201,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": True,
-                "data": {
-                    "message": "Image uploaded and verified as Labrador Retriever successfully",
-                    "image_id": image_id,
-                    "original_url": original_url,
-                    "status": "uploaded",
-                    "processing_status": "pending",
-                    "size_bytes": len(image_bytes),
-                    "content_type": content_type,
-                    "created_at": current_time,
-                    "classification": {
-                        "is_labrador": classification_result.get('is_labrador', False),
-                        "confidence_score": classification_result.get('confidence_score', 0),
-                        "detected_labels": [label['name'] for label in classification_result.get('labrador_labels', [])]
-                    }
+        return _resp(201, {
+            "success": True,
+            "data": {
+                "message": "Image uploaded and verified as Labrador Retriever successfully",
+                "image_id": image_id,
+                "original_url": original_url,
+                "status": "uploaded",
+                "processing_status": "pending",
+                "size_bytes": len(image_bytes),
+                "content_type": content_type,
+                "created_at": current_time,
+                "classification": {
+                    "is_labrador": classification_result.get('is_labrador', False),
+                    "confidence_score": classification_result.get('confidence_score', 0),
+                    "detected_labels": [label['name'] for label in classification_result.get('labrador_labels', [])]
                 }
-            })
-        }
+            }
+        })
 
-    except json.JSONDecodeError as e:
+    except JSONDecodeError as e:
         print(f"JSON decode error: {str(e)}")
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": False,
-                "error": "Invalid JSON in request body"
-            })
-        }
+        return _resp(400, {
+            "success": False,
+            "error": "Invalid JSON in request body"
+        })
 
     except Exception as e:
         print(f"Unexpected error uploading image: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key",
-                "Access-Control-Allow-Methods": "OPTIONS,GET,PUT,POST,DELETE"
-            },
-            "body": json.dumps({
-                "success": False,
-                "error": "Internal server error"
-            })
-        }
+        return _resp(500, {
+            "success": False,
+            "error": "Internal server error"
+        })
@@ -2,11 +2,141 @@
 Data schemas and structures for the Pupper application
 """
 
-from datetime import datetime
-from typing import Optional, Dict, Any
+import binascii
+import re
+import uuid
+from functools import lru_cache
+from time import gmtime, time_ns
+from datetime import date, datetime
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Optional, Dict, Any, FrozenSet, Mapping, NamedTuple, Tuple
 import json
 
 
+def _fast_utc_iso() -> str:
+    """
+    Current UTC time as an ISO 8601 string with microseconds, without datetime
+    """
+    seconds, nanos = divmod(time_ns(), 1_000_000_000)
+    tm = gmtime(seconds)
+    return "%04d-%02d-%02dT%02d:%02d:%02d.%06d" % (
+        tm.tm_year,
+        tm.tm_mon,
+        tm.tm_mday,
+        tm.tm_hour,
+        tm.tm_min,
+        tm.tm_sec,
+        nanos // 1000,
+    )
+
+
+# MM/DD/YYYY, accepting the single-digit month/day that strptime's %m/%d allow
+_MDY_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})\Z")
+
+
+# Cached so create_dog_record reuses the dates validate_dog_data just parsed
+@lru_cache(maxsize=256)
+def _parse_mdy(date_str: str) -> datetime:
+    """
+    Parse an MM/DD/YYYY string, raising ValueError if it is malformed
+    """
+    match = _MDY_RE.match(date_str)
+    if not match:
+        raise ValueError(f"Invalid MM/DD/YYYY date: {date_str!r}")
+    return datetime(int(match.group(3)), int(match.group(1)), int(match.group(2)))
+
+
+@lru_cache(maxsize=128)
+def _upper_state(state: str) -> str:
+    """
+    Canonical state code; states are a small vocabulary, so cache them
+    """
+    return state.upper()
+
+
+@lru_cache(maxsize=128)
+def _lower_color(color: str) -> str:
+    """
+    Canonical color name; colors are a small vocabulary, so cache them
+    """
+    return color.lower()
+
+
+# Accepted spellings of the one allowed species, already case-folded
+_LABRADOR_FORMS = frozenset({"labrador retriever", "labrador", "lab"})
+
+
+def _species_key(species: str) -> str:
+    """
+    Canonical form of a species name for comparison against _LABRADOR_FORMS
+    """
+    return species.strip().casefold()
+
+
+_DOG_REQUIRED_FIELDS = (
+    "shelter_name",
+    "city",
+    "state",
+    "dog_name",
+    "dog_species",
+    "shelter_entry_date",
+    "dog_description",
+    "dog_birthday",
+    "dog_weight",
+    "dog_color",
+)
+_IMAGE_REQUIRED_FIELDS = ("image_data", "content_type")
+
+
+def _first_missing(data: Dict[str, Any], fields: Tuple[str, ...]) -> Optional[str]:
+    """
+    First field that is absent or empty in data, or None if all are present
+    """
+    # all(map(...)) runs in C; only walk the fields again to name the failure
+    if all(map(data.get, fields)):
+        return None
+    return next(field for field in fields if not data.get(field))
+
+
+class DogRecord(NamedTuple):
+    """
+    Flat, tuple-backed dog record; converted to a dict only for storage
+    """
+
+    dog_id: str
+    shelter_name: str
+    city: str
+    state: str
+    dog_species: str
+    shelter_entry_date: str
+    dog_description: str
+    dog_birthday: str
+    dog_weight: float
+    dog_color: str
+    dog_age_years: float
+    dog_photo_url: Optional[str]
+    shelter_id: Optional[str]
+    created_at: str
+    updated_at: str
+    is_labrador: bool
+    dog_name_encrypted: str = ""  # Will be populated by encryption function
+    dog_photo_400x400_url: str = ""  # Will be populated after image processing
+    dog_photo_50x50_url: str = ""  # Will be populated after image processing
+    wag_count: int = 0
+    growl_count: int = 0
+    status: str = "available"  # available, adopted, pending
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to the dict shape written to DynamoDB
+        """
+        return dict(zip(_DOG_RECORD_FIELDS, self))
+
+
+_DOG_RECORD_FIELDS = DogRecord._fields
+
+
 class DogSchema:
     """
     Schema for dog data structure
@@ -26,73 +156,90 @@ class DogSchema:
         dog_color: str,
         dog_photo_url: Optional[str] = None,
         shelter_id: Optional[str] = None,
+        is_labrador: Optional[bool] = None,  # Pass True once validated
     ) -> Dict[str, Any]:
         """
         Create a standardized dog record
         """
-        import uuid
-        from datetime import datetime
+        return DogSchema.build_dog_record(
+            shelter_name=shelter_name,
+            city=city,
+            state=state,
+            dog_name=dog_name,
+            dog_species=dog_species,
+            shelter_entry_date=shelter_entry_date,
+            dog_description=dog_description,
+            dog_birthday=dog_birthday,
+            dog_weight=dog_weight,
+            dog_color=dog_color,
+            dog_photo_url=dog_photo_url,
+            shelter_id=shelter_id,
+            is_labrador=is_labrador,
+        ).to_dict()
+
+    @staticmethod
+    def build_dog_record(
+        shelter_name: str,
+        city: str,
+        state: str,
+        dog_name: str,  # Will be encrypted before storage
+        dog_species: str,
+        shelter_entry_date: str,
+        dog_description: str,
+        dog_birthday: str,
+        dog_weight: float,
+        dog_color: str,
+        dog_photo_url: Optional[str] = None,
+        shelter_id: Optional[str] = None,
+        is_labrador: Optional[bool] = None,  # Pass True once validated
+    ) -> DogRecord:
+        """
+        Create a standardized dog record as a DogRecord
+        """
+        if is_labrador is None:
+            is_labrador = _species_key(dog_species) in _LABRADOR_FORMS
 
         # Calculate age from birthday
         try:
-            birth_date = datetime.strptime(dog_birthday, "%m/%d/%Y")
-            age_years = (datetime.now() - birth_date).days / 365.25
-        except:
+            birth_ord = _parse_mdy(dog_birthday).toordinal()
+            age_years = (date.today().toordinal() - birth_ord) / 365.25
+        except (ValueError, TypeError):
             age_years = 0
 
         dog_id = str(uuid.uuid4())
-        current_time = datetime.utcnow().isoformat()
-
-        return {
-            "dog_id": dog_id,
-            "shelter_name": shelter_name,
-            "city": city,
-            "state": state.upper(),  # Standardize state format
-            "dog_name_encrypted": "",  # Will be populated by encryption function
-            "dog_species": dog_species,
-            "shelter_entry_date": shelter_entry_date,
-            "dog_description": dog_description,
-            "dog_birthday": dog_birthday,
-            "dog_weight": float(dog_weight),
-            "dog_color": dog_color.lower(),  # Standardize color format
-            "dog_age_years": round(age_years, 1),
-            "dog_photo_url": dog_photo_url,
-            "dog_photo_400x400_url": "",  # Will be populated after image processing
-            "dog_photo_50x50_url": "",  # Will be populated after image processing
-            "shelter_id": shelter_id,
-            "created_at": current_time,
-            "updated_at": current_time,
-            "is_labrador": dog_species.lower() == "labrador retriever",
-            "wag_count": 0,
-            "growl_count": 0,
-            "status": "available",  # available, adopted, pending
-        }
+        current_time = _fast_utc_iso()
+
+        return DogRecord(
+            dog_id=dog_id,
+            shelter_name=shelter_name,
+            city=city,
+            state=_upper_state(state),  # Standardize state format
+            dog_species=dog_species,
+            shelter_entry_date=shelter_entry_date,
+            dog_description=dog_description,
+            dog_birthday=dog_birthday,
+            dog_weight=float(dog_weight),
+            dog_color=_lower_color(dog_color),  # Standardize color format
+            dog_age_years=round(age_years, 1),
+            dog_photo_url=dog_photo_url,
+            shelter_id=shelter_id,
+            created_at=current_time,
+            updated_at=current_time,
+            is_labrador=is_labrador,
+        )
 
     @staticmethod
     def validate_dog_data(data: Dict[str, Any]) -> tuple[bool, str]:
         """
         Validate dog data against requirements
         """
-        required_fields = [
-            "shelter_name",
-            "city",
-            "state",
-            "dog_name",
-            "dog_species",
-            "shelter_entry_date",
-            "dog_description",
-            "dog_birthday",
-            "dog_weight",
-            "dog_color",
-        ]
-
         # Check required fields
-        for field in required_fields:
-            if field not in data or not data[field]:
-                return False, f"Missing required field: {field}"
+        field = _first_missing(data, _DOG_REQUIRED_FIELDS)
+        if field:
+            return False, f"Missing required field: {field}"
 
         # Validate species (only Labrador Retrievers allowed)
-        if data["dog_species"].lower() != "labrador retriever":
+        if _species_key(data["dog_species"]) not in _LABRADOR_FORMS:
             return False, "Only Labrador Retrievers are allowed in the Pupper app"
 
         # Validate weight is numeric
@@ -103,9 +250,9 @@ class DogSchema:
 
         # Validate dates
         try:
-            datetime.strptime(data["dog_birthday"], "%m/%d/%Y")
-            datetime.strptime(data["shelter_entry_date"], "%m/%d/%Y")
-        except ValueError:
+            _parse_mdy(data["dog_birthday"])
+            _parse_mdy(data["shelter_entry_date"])
+        except (ValueError, TypeError):
             return False, "Dates must be in MM/DD/YYYY format"
 
         return True, "Valid"
@@ -130,20 +277,21 @@ class UserSchema:
         """
         Create a standardized user record
         """
-        import uuid
-        from datetime import datetime
-
         user_id = str(uuid.uuid4())
-        current_time = datetime.utcnow().isoformat()
+        current_time = _fast_utc_iso()
 
         return {
             "user_id": user_id,
             "email": email,
             "username": username,
-            "state_preference": state_preference.upper() if state_preference else None,
+            "state_preference": _upper_state(state_preference)
+            if state_preference
+            else None,
             "max_weight_preference": max_weight_preference,
             "min_weight_preference": min_weight_preference,
-            "color_preference": color_preference.lower() if color_preference else None,
+            "color_preference": _lower_color(color_preference)
+            if color_preference
+            else None,
             "max_age_preference": max_age_preference,
             "min_age_preference": min_age_preference,
             "created_at": current_time,
@@ -164,9 +312,7 @@ class VoteSchema:
         """
         Create a standardized vote record
         """
-        from datetime import datetime
-
-        current_time = datetime.utcnow().isoformat()
+        current_time = _fast_utc_iso()
 
         return {
             "user_id": user_id,
@@ -200,17 +346,14 @@ class ShelterSchema:
         """
         Create a standardized shelter record
         """
-        import uuid
-        from datetime import datetime
-
         shelter_id = str(uuid.uuid4())
-        current_time = datetime.utcnow().isoformat()
+        current_time = _fast_utc_iso()
 
         return {
             "shelter_id": shelter_id,
             "shelter_name": shelter_name,
             "city": city,
-            "state": state.upper(),
+            "state": _upper_state(state),
             "contact_email": contact_email,
             "contact_phone": contact_phone,
             "created_at": current_time,
@@ -220,6 +363,10 @@ class ShelterSchema:
         }
 
 
+_FLOAT_FILTER_KEYS = ("min_weight", "max_weight", "min_age", "max_age")
+_CASE_FILTER_KEYS = (("state", _upper_state), ("color", _lower_color))
+
+
 class FilterSchema:
     """
     Schema for filtering dogs
@@ -230,42 +377,23 @@ class FilterSchema:
         """
         Parse and validate filter parameters
         """
-        filters = {}
-
-        # State filter
-        if "state" in query_params:
-            filters["state"] = query_params["state"].upper()
+        filters: Dict[str, Any] = {}
 
-        # Weight filters
-        if "min_weight" in query_params:
-            try:
-                filters["min_weight"] = float(query_params["min_weight"])
-            except (ValueError, TypeError):
-                pass
-
-        if "max_weight" in query_params:
-            try:
-                filters["max_weight"] = float(query_params["max_weight"])
-            except (ValueError, TypeError):
-                pass
-
-        # Age filters
-        if "min_age" in query_params:
-            try:
-                filters["min_age"] = float(query_params["min_age"])
-            except (ValueError, TypeError):
-                pass
+        # State/color filters are normalized to their stored casing
+        for key, normalize in _CASE_FILTER_KEYS:
+            if key in query_params:
+                filters[key] = normalize(query_params[key])
 
-        if "max_age" in query_params:
+        # Weight/age filters are ignored when not numeric
+        for key in _FLOAT_FILTER_KEYS:
+            value = query_params.get(key)
+            if value is None:
+                continue
             try:
-                filters["max_age"] = float(query_params["max_age"])
+                filters[key] = float(value)
             except (ValueError, TypeError):
                 pass
 
-        # Color filter
-        if "color" in query_params:
-            filters["color"] = query_params["color"].lower()
-
         return filters
 
 
@@ -281,10 +409,8 @@ class EncryptionUtils:
         Encrypt dog name before storing in database
         Note: In production, use AWS KMS or proper encryption library
         """
-        import base64
-
         # Simple base64 encoding for POC - replace with proper encryption
-        encoded = base64.b64encode(dog_name.encode()).decode()
+        encoded = binascii.b2a_base64(dog_name.encode(), newline=False).decode("ascii")
         return encoded
 
     @staticmethod
@@ -292,15 +418,34 @@ class EncryptionUtils:
         """
         Decrypt dog name for display
         """
-        import base64
-
         try:
-            decoded = base64.b64decode(encrypted_name.encode()).decode()
+            decoded = binascii.a2b_base64(encrypted_name).decode()
             return decoded
-        except:
+        # binascii.Error and UnicodeDecodeError are both ValueErrors
+        except (ValueError, TypeError):
             return "Unknown"
 
 
+# Line breaks are allowed so MIME-style wrapped base64 still validates
+_B64_CHARS = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=\r\n"
+)
+_B64_SAMPLE_SIZE = 4096
+
+# Image constants are shared read-only, so callers get no per-call allocation
+_SUPPORTED_FORMATS = frozenset({"image/jpeg", "image/jpg", "image/png", "image/webp"})
+_UNSUPPORTED_FORMAT_MESSAGE = "Unsupported content type. Supported: " + ", ".join(
+    sorted(_SUPPORTED_FORMATS)
+)
+_MAX_FILE_SIZE = 50 * 1024 * 1024
+_RESIZE_CONFIGS = (
+    MappingProxyType({"name": "400x400", "size": (400, 400), "format": "PNG"}),
+    MappingProxyType({"name": "50x50", "size": (50, 50), "format": "PNG"}),
+    MappingProxyType({"name": "800x600", "size": (800, 600), "format": "JPEG"}),
+    MappingProxyType({"name": "200x150", "size": (200, 150), "format": "JPEG"}),
+)
+
+
 class ImageSchema:
     """
     Schema for image data structure
@@ -319,9 +464,7 @@ class ImageSchema:
         """
         Create a standardized image record
         """
-        from datetime import datetime
-
-        current_time = datetime.utcnow().isoformat()
+        current_time = _fast_utc_iso()
 
         return {
             "image_id": image_id,
@@ -346,56 +489,91 @@ class ImageSchema:
         """
         Validate image upload data
         """
-        required_fields = ["image_data", "content_type"]
-
         # Check required fields
-        for field in required_fields:
-            if field not in data or not data[field]:
-                return False, f"Missing required field: {field}"
+        field = _first_missing(data, _IMAGE_REQUIRED_FIELDS)
+        if field:
+            return False, f"Missing required field: {field}"
 
         # Validate content type
-        supported_types = ["image/jpeg", "image/jpg", "image/png", "image/webp"]
-        if data["content_type"].lower() not in supported_types:
-            return (
-                False,
-                f"Unsupported content type. Supported: {', '.join(supported_types)}",
-            )
-
-        # Validate base64 image data
-        try:
-            import base64
+        if data["content_type"].lower() not in _SUPPORTED_FORMATS:
+            return False, _UNSUPPORTED_FORMAT_MESSAGE
 
-            base64.b64decode(data["image_data"])
-        except Exception:
+        # Sanity-check the base64 shape; the upload handler does the real decode
+        image_data = data["image_data"]
+        if not isinstance(image_data, str):
+            return False, "Invalid base64 image data"
+
+        # Count line breaks instead of stripping them to avoid copying the payload
+        line_breaks = image_data.count("\n") + image_data.count("\r")
+        if (len(image_data) - line_breaks) % 4 or not _B64_CHARS.issuperset(
+            image_data[:_B64_SAMPLE_SIZE]
+        ):
             return False, "Invalid base64 image data"
 
         return True, "Valid"
 
     @staticmethod
-    def get_supported_formats() -> list:
+    def get_supported_formats() -> FrozenSet[str]:
         """
-        Get list of supported image formats
+        Get set of supported image formats
         """
-        return ["image/jpeg", "image/jpg", "image/png", "image/webp"]
+        return _SUPPORTED_FORMATS
 
     @staticmethod
     def get_max_file_size() -> int:
         """
         Get maximum file size in bytes (50MB)
         """
-        return 50 * 1024 * 1024
+        return _MAX_FILE_SIZE
 
     @staticmethod
-    def get_resize_configurations() -> list:
+    def get_resize_configurations() -> Tuple[Mapping[str, Any], ...]:
         """
         Get standard resize configurations
         """
-        return [
-            {"name": "400x400", "size": (400, 400), "format": "PNG"},
-            {"name": "50x50", "size": (50, 50), "format": "PNG"},
-            {"name": "800x600", "size": (800, 600), "format": "JPEG"},
-            {"name": "200x150", "size": (200, 150), "format": "JPEG"},
-        ]
+        return _RESIZE_CONFIGS
+
+
+# Shared by every response; the Lambda runtime needs a plain dict here
+_CORS_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+}
+
+
+def _json_default(obj: Any) -> Any:
+    """
+    Encode DynamoDB Decimals as JSON numbers
+    """
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+try:
+    import orjson
+
+    def _encode_json(obj: Any) -> str:
+        """
+        Serialize a response body to compact JSON
+        """
+        return orjson.dumps(
+            obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+except ImportError:
+    # Fallback for deployments without the shared Lambda layer
+    _json_encoder = json.JSONEncoder(
+        separators=(",", ":"), ensure_ascii=False, default=_json_default
+    )
+
+    def _encode_json(obj: Any) -> str:
+        """
+        Serialize a response body to compact JSON
+        """
+        return _json_encoder.encode(obj)
 
 
 # Response formatting utilities
@@ -411,13 +589,8 @@ class ResponseFormatter:
         """
         return {
             "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            },
-            "body": json.dumps({"success": True, "message": message, "data": data}),
+            "headers": _CORS_HEADERS,
+            "body": _encode_json({"success": True, "message": message, "data": data}),
         }
 
     @staticmethod
@@ -427,11 +600,6 @@ class ResponseFormatter:
         """
         return {
             "statusCode": status_code,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type, Authorization",
-            },
-            "body": json.dumps({"success": False, "error": error_message}),
+            "headers": _CORS_HEADERS,
+            "body": _encode_json({"success": False, "error": error_message}),
         }
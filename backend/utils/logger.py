@@ -6,26 +6,39 @@ import json
 import logging
 import os
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import structlog
 from pythonjsonlogger import jsonlogger
 
 
-def setup_logging(
-    service_name: str = "pupper-api", log_level: str = "INFO", enable_json: bool = True
-) -> structlog.BoundLogger:
+# Environment context is fixed for the lifetime of a Lambda container
+_SERVICE_CONTEXT = {
+    "version": os.environ.get("SERVICE_VERSION", "1.0.0"),
+    "environment": os.environ.get("ENVIRONMENT", "development"),
+    "aws_region": os.environ.get("AWS_REGION", "us-east-1"),
+}
+
+# Shared default for log_error's context; a plain dict so JSONRenderer emits {}
+_EMPTY_CONTEXT: Dict[str, Any] = {}
+
+# (log_level, enable_json) of the active configuration, None until configured
+_CONFIGURED = None
+
+
+def _configure_logging(log_level: str, enable_json: bool) -> None:
     """
-    Set up structured logging for the application
+    Configure stdlib logging and structlog, skipping repeat configurations
 
     Args:
-        service_name: Name of the service for logging context
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
         enable_json: Whether to use JSON formatting
-
-    Returns:
-        Configured structlog logger
     """
+    global _CONFIGURED
+
+    if _CONFIGURED == (log_level, enable_json):
+        return
+
     # Configure standard library logging
     logging.basicConfig(
         format="%(message)s",
@@ -58,16 +71,30 @@ def setup_logging(
         cache_logger_on_first_use=True,
     )
 
+    _CONFIGURED = (log_level, enable_json)
+
+
+def setup_logging(
+    service_name: str = "pupper-api", log_level: str = "INFO", enable_json: bool = True
+) -> structlog.BoundLogger:
+    """
+    Set up structured logging for the application
+
+    Args:
+        service_name: Name of the service for logging context
+        log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
+        enable_json: Whether to use JSON formatting
+
+    Returns:
+        Configured structlog logger
+    """
+    _configure_logging(log_level, enable_json)
+
     # Create logger with service context
     logger = structlog.get_logger(service_name)
 
     # Add common context
-    logger = logger.bind(
-        service=service_name,
-        version=os.environ.get("SERVICE_VERSION", "1.0.0"),
-        environment=os.environ.get("ENVIRONMENT", "development"),
-        aws_region=os.environ.get("AWS_REGION", "us-east-1"),
-    )
+    logger = logger.bind(service=service_name, **_SERVICE_CONTEXT)
 
     return logger
 
@@ -142,14 +169,12 @@ def log_api_response(
         response_size: Size of response body in bytes
         duration_ms: Request duration in milliseconds
     """
-    log_data = {
-        "http_status": status_code,
-        "response_size_bytes": response_size,
-        "duration_ms": duration_ms,
-    }
-
-    # Remove None values
-    log_data = {k: v for k, v in log_data.items() if v is not None}
+    # Build sparsely rather than filtering None values afterwards
+    log_data: Dict[str, Any] = {"http_status": status_code}
+    if response_size is not None:
+        log_data["response_size_bytes"] = response_size
+    if duration_ms is not None:
+        log_data["duration_ms"] = duration_ms
 
     if status_code >= 400:
         logger.error("API request failed", **log_data)
@@ -176,16 +201,16 @@ def log_database_operation(
         duration_ms: Operation duration in milliseconds
         success: Whether the operation was successful
     """
-    log_data = {
+    # Build sparsely rather than filtering None values afterwards
+    log_data: Dict[str, Any] = {
         "db_operation": operation,
         "db_table": table_name,
-        "db_key": key,
-        "duration_ms": duration_ms,
         "success": success,
     }
-
-    # Remove None values
-    log_data = {k: v for k, v in log_data.items() if v is not None}
+    if key is not None:
+        log_data["db_key"] = key
+    if duration_ms is not None:
+        log_data["duration_ms"] = duration_ms
 
     if success:
         logger.info("Database operation completed", **log_data)
@@ -193,6 +218,23 @@ def log_database_operation(
         logger.error("Database operation failed", **log_data)
 
 
+def bind_db_logger(
+    logger: structlog.BoundLogger, table_name: str
+) -> Tuple[Callable[..., Any], Callable[..., Any]]:
+    """
+    Pre-bind info/error methods to a table for loops of database operations
+
+    Args:
+        logger: Structured logger instance
+        table_name: DynamoDB table name
+
+    Returns:
+        (info, error) bound methods with db_table already in context
+    """
+    table_logger = logger.bind(db_table=table_name)
+    return table_logger.info, table_logger.error
+
+
 def log_s3_operation(
     logger: structlog.BoundLogger,
     operation: str,
@@ -214,17 +256,17 @@ def log_s3_operation(
         duration_ms: Operation duration in milliseconds
         success: Whether the operation was successful
     """
-    log_data = {
+    # Build sparsely rather than filtering None values afterwards
+    log_data: Dict[str, Any] = {
         "s3_operation": operation,
         "s3_bucket": bucket,
         "s3_key": key,
-        "object_size_bytes": size_bytes,
-        "duration_ms": duration_ms,
         "success": success,
     }
-
-    # Remove None values
-    log_data = {k: v for k, v in log_data.items() if v is not None}
+    if size_bytes is not None:
+        log_data["object_size_bytes"] = size_bytes
+    if duration_ms is not None:
+        log_data["duration_ms"] = duration_ms
 
     if success:
         logger.info("S3 operation completed", **log_data)
@@ -246,17 +288,15 @@ class LoggingMixin:
 
     def log_method_call(self, method_name: str, **kwargs) -> None:
         """Log method call with parameters"""
-        self.logger.info(
-            f"Method called: {method_name}", method=method_name, parameters=kwargs
-        )
+        self.logger.info("method_called", method=method_name, parameters=kwargs)
 
     def log_error(
         self, error: Exception, context: Optional[Dict[str, Any]] = None
     ) -> None:
         """Log error with context"""
         self.logger.error(
-            f"Error occurred: {str(error)}",
+            "error",
             error_type=type(error).__name__,
             error_message=str(error),
-            context=context or {},
+            context=context or _EMPTY_CONTEXT,
         )
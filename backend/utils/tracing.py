@@ -4,7 +4,7 @@ AWS X-Ray tracing utilities for the Pupper application
 
 import functools
 import os
-import time
+from contextlib import nullcontext
 from typing import Any, Callable, Dict, Optional
 
 from aws_xray_sdk.core import patch_all, xray_recorder
@@ -13,21 +13,49 @@ from aws_xray_sdk.core.models.segment import Segment
 from aws_xray_sdk.core.models.subsegment import Subsegment
 
 
+# The runtime environment does not change within a Lambda container
+_IN_LAMBDA = bool(os.environ.get("AWS_LAMBDA_FUNCTION_NAME"))
+
+# Decorators install no wrapper at all when tracing is off (local runs, tests)
+_TRACING_ENABLED = (
+    _IN_LAMBDA and os.environ.get("AWS_XRAY_SDK_ENABLED", "true").lower() != "false"
+)
+
+# Request headers recorded as annotations; the rest are not traced
+_TRACED_HEADERS = ("user-agent", "content-type", "x-forwarded-for")
+
+# Set once patch_all()/configure() have run for this container
+_XRAY_READY = False
+
+
+def _is_sampled(entity: Any) -> bool:
+    """
+    Whether a (sub)segment will be sent, so building its metadata is worthwhile
+    """
+    return entity is not None and getattr(entity, "sampled", True)
+
+
 def setup_xray_tracing() -> None:
     """
-    Set up AWS X-Ray tracing for the application
+    Set up AWS X-Ray tracing for the application, once per container
     """
+    global _XRAY_READY
+
     # Only enable tracing in AWS Lambda environment
-    if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
-        # Patch AWS SDK calls
-        patch_all()
-
-        # Configure X-Ray recorder
-        xray_recorder.configure(
-            context_missing="LOG_ERROR",
-            plugins=("EC2Plugin", "ECSPlugin"),
-            daemon_address=os.environ.get("_X_AMZN_TRACE_ID"),
-        )
+    if _XRAY_READY or not _IN_LAMBDA:
+        return
+
+    # Patch AWS SDK calls
+    patch_all()
+
+    # Configure X-Ray recorder
+    xray_recorder.configure(
+        context_missing="LOG_ERROR",
+        plugins=("EC2Plugin", "ECSPlugin"),
+        daemon_address=os.environ.get("_X_AMZN_TRACE_ID"),
+    )
+
+    _XRAY_READY = True
 
 
 def trace_lambda_handler(func: Callable) -> Callable:
@@ -40,15 +68,18 @@ def trace_lambda_handler(func: Callable) -> Callable:
     Returns:
         Wrapped function with tracing
     """
+    if not _TRACING_ENABLED:
+        return func
 
     @functools.wraps(func)
     def wrapper(event: Dict[str, Any], context: Any) -> Any:
-        # Set up tracing
-        setup_xray_tracing()
+        # Set up tracing on the first invocation only
+        if not _XRAY_READY:
+            setup_xray_tracing()
 
         # Add metadata to the segment
         segment = xray_recorder.current_segment()
-        if segment:
+        if _is_sampled(segment):
             segment.put_metadata(
                 "lambda",
                 {
@@ -64,17 +95,20 @@ def trace_lambda_handler(func: Callable) -> Callable:
                 segment.put_http_meta("method", event["httpMethod"])
                 segment.put_http_meta("url", event.get("path", ""))
 
-                # Add request headers
-                headers = event.get("headers", {})
-                if headers:
-                    segment.put_metadata(
-                        "http_request",
-                        {
-                            "headers": headers,
-                            "query_parameters": event.get("queryStringParameters"),
-                            "path_parameters": event.get("pathParameters"),
-                        },
-                    )
+                # Annotate a few useful headers rather than shipping them all
+                headers = event.get("headers") or {}
+                for header in _TRACED_HEADERS:
+                    value = headers.get(header) or headers.get(header.title())
+                    if value:
+                        segment.put_annotation(header.replace("-", "_"), value)
+
+                segment.put_metadata(
+                    "http_request",
+                    {
+                        "query_parameters": event.get("queryStringParameters"),
+                        "path_parameters": event.get("pathParameters"),
+                    },
+                )
 
         try:
             result = func(event, context)
@@ -97,6 +131,35 @@ def trace_lambda_handler(func: Callable) -> Callable:
     return wrapper
 
 
+def bind_trace_context(func: Callable) -> Callable:
+    """
+    Bind the current X-Ray trace entity to a function run on another thread
+
+    X-Ray tracks the active (sub)segment per thread, so work handed to a
+    thread pool would otherwise have no parent for its subsegments.
+
+    Args:
+        func: Function to run in a worker thread
+
+    Returns:
+        Wrapped function that runs under the caller's trace entity
+    """
+    if not _TRACING_ENABLED:
+        return func
+
+    entity = xray_recorder.get_trace_entity()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> Any:
+        xray_recorder.set_trace_entity(entity)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            xray_recorder.clear_trace_entities()
+
+    return wrapper
+
+
 def trace_function(
     name: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None
 ):
@@ -112,12 +175,15 @@ def trace_function(
     """
 
     def decorator(func: Callable) -> Callable:
+        if not _TRACING_ENABLED:
+            return func
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
             subsegment_name = name or f"{func.__module__}.{func.__name__}"
 
             with xray_recorder.in_subsegment(subsegment_name) as subsegment:
-                if subsegment:
+                if _is_sampled(subsegment):
                     # Add function metadata
                     subsegment.put_metadata(
                         "function",
@@ -134,16 +200,7 @@ def trace_function(
                         subsegment.put_metadata("custom", metadata)
 
                 try:
-                    start_time = time.time()
-                    result = func(*args, **kwargs)
-
-                    if subsegment:
-                        duration = (time.time() - start_time) * 1000
-                        subsegment.put_metadata(
-                            "performance", {"duration_ms": duration}
-                        )
-
-                    return result
+                    return func(*args, **kwargs)
 
                 except Exception as e:
                     if subsegment:
@@ -170,30 +227,24 @@ def trace_database_operation(
         Decorator function
     """
 
+    # Fixed per decorated function, so built once and shared by every call
+    subsegment_name = f"dynamodb_{operation}"
+    metadata = {"operation": operation, "table_name": table_name, "key": key}
+
     def decorator(func: Callable) -> Callable:
+        if not _TRACING_ENABLED:
+            return func
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            with xray_recorder.in_subsegment(f"dynamodb_{operation}") as subsegment:
-                if subsegment:
-                    subsegment.put_metadata(
-                        "dynamodb",
-                        {
-                            "operation": operation,
-                            "table_name": table_name,
-                            "key": key,
-                        },
-                    )
+            with xray_recorder.in_subsegment(subsegment_name) as subsegment:
+                if _is_sampled(subsegment):
+                    subsegment.put_metadata("dynamodb", metadata)
 
                 try:
-                    start_time = time.time()
                     result = func(*args, **kwargs)
 
-                    if subsegment:
-                        duration = (time.time() - start_time) * 1000
-                        subsegment.put_metadata(
-                            "performance", {"duration_ms": duration}
-                        )
-
+                    if _is_sampled(subsegment):
                         # Add result metadata (without sensitive data)
                         if isinstance(result, dict):
                             item_count = 0
@@ -235,30 +286,24 @@ def trace_s3_operation(operation: str, bucket: str, key: str):
         Decorator function
     """
 
+    # Fixed per decorated function, so built once and shared by every call
+    subsegment_name = f"s3_{operation}"
+    metadata = {"operation": operation, "bucket": bucket, "key": key}
+
     def decorator(func: Callable) -> Callable:
+        if not _TRACING_ENABLED:
+            return func
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            with xray_recorder.in_subsegment(f"s3_{operation}") as subsegment:
-                if subsegment:
-                    subsegment.put_metadata(
-                        "s3",
-                        {
-                            "operation": operation,
-                            "bucket": bucket,
-                            "key": key,
-                        },
-                    )
+            with xray_recorder.in_subsegment(subsegment_name) as subsegment:
+                if _is_sampled(subsegment):
+                    subsegment.put_metadata("s3", metadata)
 
                 try:
-                    start_time = time.time()
                     result = func(*args, **kwargs)
 
-                    if subsegment:
-                        duration = (time.time() - start_time) * 1000
-                        subsegment.put_metadata(
-                            "performance", {"duration_ms": duration}
-                        )
-
+                    if _is_sampled(subsegment):
                         # Add result metadata
                         if isinstance(result, dict) and "ContentLength" in result:
                             subsegment.put_metadata(
@@ -294,6 +339,9 @@ class TracingMixin:
             method_name: Name of the method being traced
             metadata: Additional metadata to include
         """
+        if not _TRACING_ENABLED:
+            return nullcontext()
+
         return xray_recorder.in_subsegment(
             f"{self.__class__.__name__}.{method_name}", metadata=metadata or {}
         )
@@ -327,6 +327,8 @@ class PupperCdkStack(Stack):
                                 "dynamodb:DeleteItem",
                                 "dynamodb:Query",
                                 "dynamodb:Scan",
+                                "dynamodb:BatchWriteItem",
+                                "dynamodb:DescribeTable",
                             ],
                             resources=[
                                 self.dogs_table.table_arn,
@@ -165,7 +165,9 @@ class PupperCdkStack(Stack):
                                 "dynamodb:UpdateItem",
                                 "dynamodb:DeleteItem",
                                 "dynamodb:Query",
-                                "dynamodb:Scan"
+                                "dynamodb:Scan",
+                                "dynamodb:BatchWriteItem",
+                                "dynamodb:DescribeTable"
                             ],
                             resources=[
                                 f"arn:aws:dynamodb:{self.region}:{self.account}:table/pupper-*"
@@ -179,9 +179,20 @@ def test_lambda_handler_structure():
     print(f"   Success: {mock_response['body']['success']}")
     print(f"   Acceptable: {mock_response['body']['is_acceptable']}")
 
+def run_classification_live(bucket='pupper-images-test', key='uploads/test-image.jpg'):
+    """Run the classify Lambda handler locally against real Rekognition (needs AWS credentials)"""
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'backend', 'lambda', 'image_processing'))
+    from classify import lambda_handler
+    
+    result = lambda_handler({'bucket': bucket, 'key': key}, None)
+    print(json.dumps(result, indent=2))
+
 if __name__ == "__main__":
     test_classification_logic()
     test_lambda_handler_structure()
     
+    if "--live" in sys.argv:
+        run_classification_live()
+    
     print("\n🚀 Ready for deployment!")
     print("Run './deploy_with_classification.sh' to deploy to AWS")
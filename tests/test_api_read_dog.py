@@ -228,7 +228,19 @@ class TestReadDogAPI:
                 {'AttributeName': 'dog_id', 'KeyType': 'HASH'}
             ],
             AttributeDefinitions=[
-                {'AttributeName': 'dog_id', 'AttributeType': 'S'}
+                {'AttributeName': 'dog_id', 'AttributeType': 'S'},
+                {'AttributeName': 'state', 'AttributeType': 'S'},
+                {'AttributeName': 'created_at', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    'IndexName': 'StateIndex',
+                    'KeySchema': [
+                        {'AttributeName': 'state', 'KeyType': 'HASH'},
+                        {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
+                    ],
+                    'Projection': {'ProjectionType': 'ALL'}
+                }
             ],
             BillingMode='PAY_PER_REQUEST'
         )
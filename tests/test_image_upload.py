@@ -458,39 +458,3 @@ class TestImageSchema:
         
         assert is_valid is False
         assert "Invalid base64 image data" in message
-    
-    def test_get_supported_formats(self):
-        """Test getting supported formats"""
-        formats = ImageSchema.get_supported_formats()
-        
-        assert isinstance(formats, list)
-        assert 'image/jpeg' in formats
-        assert 'image/png' in formats
-        assert len(formats) > 0
-    
-    def test_get_max_file_size(self):
-        """Test getting max file size"""
-        max_size = ImageSchema.get_max_file_size()
-        
-        assert isinstance(max_size, int)
-        assert max_size == 50 * 1024 * 1024  # 50MB
-    
-    def test_get_resize_configurations(self):
-        """Test getting resize configurations"""
-        configs = ImageSchema.get_resize_configurations()
-        
-        assert isinstance(configs, list)
-        assert len(configs) > 0
-        
-        # Check that required configs exist
-        config_names = [config['name'] for config in configs]
-        assert '400x400' in config_names
-        assert '50x50' in config_names
-        
-        # Check config structure
-        for config in configs:
-            assert 'name' in config
-            assert 'size' in config
-            assert 'format' in config
-            assert isinstance(config['size'], tuple)
-            assert len(config['size']) == 2
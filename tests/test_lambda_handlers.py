@@ -0,0 +1,535 @@
+"""
+Unit tests for the Lambda handler modules
+
+The handlers live under backend/lambda/, and "lambda" is a Python keyword,
+so they are loaded by file path rather than imported as a package.
+"""
+
+import importlib.util
+import json
+import logging
+import os
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+# The handlers create boto3 clients at import time
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+LAMBDA_DIR = os.path.join(os.path.dirname(__file__), "..", "backend", "lambda")
+
+
+def load_handler(relative_path, module_name):
+    """Load a Lambda handler module from its path under backend/lambda/"""
+    spec = importlib.util.spec_from_file_location(
+        module_name, os.path.join(LAMBDA_DIR, relative_path)
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+create = load_handler("dogs/create.py", "dogs_create")
+read = load_handler("dogs/read.py", "dogs_read")
+update = load_handler("dogs/update.py", "dogs_update")
+upload = load_handler("image_processing/upload.py", "image_processing_upload")
+
+
+def transaction_canceled(*reason_codes):
+    """TransactWriteItems error with one cancellation reason per item"""
+    return ClientError(
+        {
+            "Error": {"Code": "TransactionCanceledException", "Message": ""},
+            "CancellationReasons": [{"Code": code} for code in reason_codes],
+        },
+        "TransactWriteItems",
+    )
+
+
+def dog_items(count):
+    """Stored dogs in DynamoDB attribute-value form"""
+    return [
+        {
+            "dog_id": {"S": f"dog-{i}"},
+            "dog_name_encrypted": {"S": "Rmlkbw=="},  # "Fido" in base64
+            "state": {"S": "VA"},
+            "created_at": {"S": f"2024-01-0{i + 1}T12:00:00.000000Z"},
+            "dog_weight": {"N": "32"},
+        }
+        for i in range(count)
+    ]
+
+
+def paged_scan(items):
+    """Fake Scan honouring Limit and ExclusiveStartKey over items"""
+
+    def scan(**request):
+        start = 0
+        if "ExclusiveStartKey" in request:
+            start_id = request["ExclusiveStartKey"]["dog_id"]
+            start = 1 + next(
+                i for i, item in enumerate(items) if item["dog_id"] == start_id
+            )
+        page = items[start : start + request["Limit"]]
+        response = {"Items": page}
+        if start + request["Limit"] < len(items):
+            response["LastEvaluatedKey"] = {"dog_id": page[-1]["dog_id"]}
+        return response
+
+    return scan
+
+
+def list_event(**query_parameters):
+    """API Gateway event listing dogs"""
+    return {
+        "httpMethod": "GET",
+        "path": "/dogs",
+        "queryStringParameters": query_parameters,
+    }
+
+
+def vote_event(vote_type="wag", user_id="user-1", dog_id="dog-1"):
+    """API Gateway event voting on a dog"""
+    return {
+        "httpMethod": "PUT",
+        "pathParameters": {"dog_id": dog_id},
+        "body": json.dumps({"vote_type": vote_type, "user_id": user_id}),
+    }
+
+
+@pytest.fixture
+def valid_dog_data():
+    """Valid dog data for testing"""
+    return {
+        "shelter_name": "Arlington Shelter",
+        "city": "Arlington",
+        "state": "VA",
+        "dog_name": "Fido",
+        "dog_species": "Labrador Retriever",
+        "shelter_entry_date": "1/7/2019",
+        "dog_description": "Good boy",
+        "dog_birthday": "4/23/2014",
+        "dog_weight": 32,
+        "dog_color": "Brown",
+        "dog_photo_url": "https://example.com/photo.jpg",
+    }
+
+
+class TestCreateDogHandler:
+    """Test cases for the create dog handler"""
+
+    def test_dynamodb_item_marshalling(self):
+        """Test that dog records are marshalled into DynamoDB attribute values"""
+        item = create.to_dynamodb_item(
+            {
+                "dog_id": "abc",
+                "dog_weight": 32,
+                "dog_age_years": Decimal("4.5"),
+                "is_labrador": True,
+                "dog_photo_url": "",
+                "shelter_id": None,
+            }
+        )
+
+        assert item["dog_id"] == {"S": "abc"}
+        assert item["dog_weight"] == {"N": "32"}
+        assert item["dog_age_years"] == {"N": "4.5"}
+        assert item["is_labrador"] == {"BOOL": True}
+        assert item["dog_photo_url"] == {"S": ""}
+        assert item["shelter_id"] == {"NULL": True}
+
+    def test_create_dog_with_null_optional_field(self, valid_dog_data):
+        """Test that a JSON null optional field is stored as NULL"""
+        valid_dog_data["dog_photo_url"] = None
+        valid_dog_data["shelter_id"] = None
+        event = {"httpMethod": "POST", "body": json.dumps(valid_dog_data)}
+
+        with patch.object(create, "dynamodb_client") as mock_client:
+            response = create.lambda_handler(event, None)
+
+        assert response["statusCode"] == 201
+        item = mock_client.put_item.call_args.kwargs["Item"]
+        assert item["dog_photo_url"] == {"NULL": True}
+        assert item["shelter_id"] == {"NULL": True}
+
+    def test_create_dogs_batch(self, valid_dog_data):
+        """Test bulk creation reports a status for every submitted dog"""
+        event = {
+            "httpMethod": "POST",
+            "body": json.dumps(
+                {"dogs": [valid_dog_data] * 30 + [{"city": "Arlington"}]}
+            ),
+        }
+
+        with patch.object(create, "dynamodb_client") as mock_client:
+            mock_client.batch_write_item.return_value = {"UnprocessedItems": {}}
+            response = create.lambda_handler(event, None)
+
+        # 30 valid dogs need two BatchWriteItem calls (25 + 5)
+        assert mock_client.batch_write_item.call_count == 2
+        assert response["statusCode"] == 201
+
+        body = json.loads(response["body"])
+        assert body["success"] is False
+        assert body["data"]["created"] == 30
+        assert body["data"]["failed"] == 1
+        assert "Missing required field" in body["data"]["results"][30]["error"]
+
+    def test_create_dogs_batch_chunk_error(self, valid_dog_data):
+        """Test a failed chunk is reported per dog after earlier chunks saved"""
+        event = {
+            "httpMethod": "POST",
+            "body": json.dumps({"dogs": [valid_dog_data] * 30}),
+        }
+        throttled = ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException"}},
+            "BatchWriteItem",
+        )
+
+        with patch.object(create, "dynamodb_client") as mock_client:
+            mock_client.batch_write_item.side_effect = [
+                {"UnprocessedItems": {}},
+                throttled,
+            ]
+            response = create.lambda_handler(event, None)
+
+        assert response["statusCode"] == 201
+        body = json.loads(response["body"])
+        assert body["data"]["created"] == 25
+        assert body["data"]["failed"] == 5
+        assert all(result["success"] for result in body["data"]["results"][:25])
+        assert {result["error"] for result in body["data"]["results"][25:]} == {
+            "Failed to save dog"
+        }
+
+    def test_create_dogs_batch_retry_error(self, valid_dog_data):
+        """Test a retry that raises reports only the dogs still unwritten"""
+        event = {
+            "httpMethod": "POST",
+            "body": json.dumps({"dogs": [valid_dog_data] * 3}),
+        }
+
+        throttled = ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException"}},
+            "BatchWriteItem",
+        )
+
+        def batch_write_item(RequestItems):
+            # The first call stores all but the last dog, the retry fails
+            if mock_client.batch_write_item.call_count > 1:
+                raise throttled
+            requests = RequestItems[create.DOGS_TABLE]
+            return {"UnprocessedItems": {create.DOGS_TABLE: requests[-1:]}}
+
+        with patch.object(create, "dynamodb_client") as mock_client, patch.object(
+            create.time, "sleep"
+        ):
+            mock_client.batch_write_item.side_effect = batch_write_item
+            response = create.lambda_handler(event, None)
+
+        assert response["statusCode"] == 201
+        results = json.loads(response["body"])["data"]["results"]
+        assert [result["success"] for result in results] == [True, True, False]
+        assert results[2]["error"] == "Failed to save dog"
+
+    def test_create_dogs_batch_all_writes_fail(self, valid_dog_data):
+        """Test a batch lost to a server-side failure is not reported as a 400"""
+        event = {
+            "httpMethod": "POST",
+            "body": json.dumps({"dogs": [valid_dog_data] * 3}),
+        }
+
+        with patch.object(create, "dynamodb_client") as mock_client:
+            mock_client.batch_write_item.side_effect = EndpointConnectionError(
+                endpoint_url="https://dynamodb.us-east-1"
+            )
+            response = create.lambda_handler(event, None)
+
+        assert response["statusCode"] == 503
+        assert json.loads(response["body"])["data"]["failed"] == 3
+
+    def test_create_dogs_batch_too_many(self, valid_dog_data):
+        """Test bulk creation refuses more than MAX_BATCH_DOGS dogs"""
+        event = {
+            "httpMethod": "POST",
+            "body": json.dumps(
+                {"dogs": [valid_dog_data] * (create.MAX_BATCH_DOGS + 1)}
+            ),
+        }
+
+        with patch.object(create, "dynamodb_client") as mock_client:
+            response = create.lambda_handler(event, None)
+
+        assert response["statusCode"] == 400
+        mock_client.batch_write_item.assert_not_called()
+
+    def test_calculate_age_years(self):
+        """Test age calculation accepts single-digit months and days"""
+        assert create.calculate_age_years("1/1/2020", date(2024, 1, 1)) == 4.0
+        assert create.calculate_age_years("07/01/2020", date(2021, 1, 1)) == 0.5
+
+        with pytest.raises(ValueError):
+            create.calculate_age_years("2020-01-01", date(2024, 1, 1))
+
+
+class TestReadDogHandler:
+    """Test cases for the read dog handler"""
+
+    def test_get_dogs_with_cursor(self):
+        """Test cursor paging walks every dog exactly once"""
+        with patch.object(read, "dynamodb_client") as mock_client:
+            mock_client.scan.side_effect = paged_scan(dog_items(5))
+
+            # Follow next_cursor until the listing is exhausted
+            seen = []
+            cursor = ""
+            while True:
+                response = read.lambda_handler(
+                    list_event(cursor=cursor, limit="2"), None
+                )
+                assert response["statusCode"] == 200
+
+                data = json.loads(response["body"])["data"]
+                assert len(data["dogs"]) <= 2
+                assert all(dog["dog_name"] == "Fido" for dog in data["dogs"])
+                seen.extend(dog["dog_id"] for dog in data["dogs"])
+
+                cursor = data["pagination"]["next_cursor"]
+                if not cursor:
+                    break
+
+        assert seen == [f"dog-{i}" for i in range(5)]
+
+    def test_get_dogs_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        with patch.object(read, "dynamodb_client") as mock_client:
+            response = read.lambda_handler(list_event(cursor="not-a-cursor!"), None)
+
+        assert response["statusCode"] == 400
+        mock_client.scan.assert_not_called()
+
+    def test_get_dogs_cursor_from_other_listing(self):
+        """Test a state listing's cursor replayed without the state filter"""
+        state_key = {
+            "dog_id": {"S": "dog-1"},
+            "state": {"S": "VA"},
+            "created_at": {"S": "2024-01-02T12:00:00.000000Z"},
+        }
+        cursor = read.encode_cursor(state_key)
+
+        with patch.object(read, "dynamodb_client") as mock_client:
+            response = read.lambda_handler(list_event(cursor=cursor), None)
+
+        assert response["statusCode"] == 400
+        assert json.loads(response["body"])["error"] == "Invalid cursor"
+        mock_client.scan.assert_not_called()
+
+    def test_get_dogs_cursor_rejected_by_dynamodb(self):
+        """Test a start key DynamoDB refuses is reported as a bad cursor"""
+        cursor = read.encode_cursor({"dog_id": {"S": ""}})
+        invalid_key = ClientError(
+            {"Error": {"Code": "ValidationException", "Message": ""}}, "Scan"
+        )
+
+        with patch.object(read, "dynamodb_client") as mock_client:
+            mock_client.scan.side_effect = invalid_key
+            response = read.lambda_handler(list_event(cursor=cursor), None)
+
+        assert response["statusCode"] == 400
+        assert json.loads(response["body"])["error"] == "Invalid cursor"
+
+    def test_get_dog_non_ascii_stored_name(self):
+        """Test a stored name that is not base64 comes back as Unknown"""
+        item = dog_items(1)[0]
+        item["dog_name_encrypted"] = {"S": "Fidö"}
+        event = {"httpMethod": "GET", "pathParameters": {"dog_id": "dog-0"}}
+
+        with patch.object(read, "dynamodb_client") as mock_client:
+            mock_client.get_item.return_value = {"Item": item}
+            response = read.lambda_handler(event, None)
+
+        assert response["statusCode"] == 200
+        assert json.loads(response["body"])["data"]["dog_name"] == "Unknown"
+
+    def test_get_dogs_non_ascii_stored_name(self):
+        """Test one undecodable name does not fail the whole listing"""
+        items = dog_items(2)
+        items[0]["dog_name_encrypted"] = {"S": "Fidö"}
+
+        with patch.object(read, "dynamodb_client") as mock_client:
+            mock_client.scan.side_effect = paged_scan(items)
+            response = read.lambda_handler(list_event(cursor=""), None)
+
+        assert response["statusCode"] == 200
+        names = [
+            dog["dog_name"] for dog in json.loads(response["body"])["data"]["dogs"]
+        ]
+        assert names == ["Unknown", "Fido"]
+
+    def test_table_item_count_is_cached(self):
+        """Test the item count is described once, then again after the TTL"""
+        with patch.object(read, "dynamodb_client") as mock_client, patch.dict(
+            read._ITEM_COUNT_CACHE, {"count": None, "expires_at": 0.0}
+        ), patch.object(read.time, "monotonic", return_value=1000.0) as clock:
+            mock_client.describe_table.return_value = {"Table": {"ItemCount": 1200}}
+
+            assert read.table_item_count() == 1200
+            assert read.table_item_count() == 1200
+            assert mock_client.describe_table.call_count == 1
+
+            clock.return_value += read.ITEM_COUNT_TTL_SECONDS
+            mock_client.describe_table.return_value = {"Table": {"ItemCount": 3000}}
+            assert read.table_item_count() == 3000
+            assert mock_client.describe_table.call_count == 2
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            ClientError(
+                {"Error": {"Code": "AccessDeniedException", "Message": ""}},
+                "DescribeTable",
+            ),
+            EndpointConnectionError(endpoint_url="https://dynamodb.us-east-1"),
+        ],
+    )
+    def test_table_item_count_failure_not_cached(self, error):
+        """Test a failed describe falls back to 0 without caching it"""
+        with patch.object(read, "dynamodb_client") as mock_client, patch.dict(
+            read._ITEM_COUNT_CACHE, {"count": None, "expires_at": 0.0}
+        ):
+            mock_client.describe_table.side_effect = error
+            assert read.table_item_count() == 0
+            assert read.scan_segment_count() == 1
+
+            mock_client.describe_table.side_effect = None
+            mock_client.describe_table.return_value = {"Table": {"ItemCount": 1200}}
+            assert read.table_item_count() == 1200
+
+    @pytest.mark.parametrize(
+        "log_level, expected",
+        [("debug", logging.DEBUG), ("verbose", logging.INFO)],
+    )
+    def test_log_level_from_environment(self, log_level, expected):
+        """Test LOG_LEVEL is case-insensitive and unknown levels fall back"""
+        root_logger = logging.getLogger()
+        original_level = root_logger.level
+        try:
+            with patch.dict(os.environ, {"LOG_LEVEL": log_level}):
+                load_handler("dogs/read.py", "dogs_read_log_level")
+            assert root_logger.level == expected
+        finally:
+            root_logger.setLevel(original_level)
+
+    def test_sort_dogs_top_matches_full_sort(self):
+        """Test that selecting the top dogs gives the head of the full sort"""
+        dogs = [{"dog_id": str(i), "dog_weight": Decimal(i % 7)} for i in range(50)]
+
+        for sort_order in ("asc", "desc"):
+            full = read.sort_dogs(dogs, "dog_weight", sort_order)
+            top = read.sort_dogs(dogs, "dog_weight", sort_order, top=10)
+            assert top == full[:10]
+
+
+class TestVoteHandler:
+    """Test cases for voting through the update dog handler"""
+
+    def test_first_vote(self):
+        """Test a first vote records the row and one count together"""
+        with patch.object(update, "dynamodb_client") as mock_client:
+            response = update.lambda_handler(vote_event("wag"), None)
+
+        assert response["statusCode"] == 200
+        assert mock_client.transact_write_items.call_count == 1
+        vote_row, dog = mock_client.transact_write_items.call_args.kwargs[
+            "TransactItems"
+        ]
+        assert vote_row["Update"]["ConditionExpression"] == (
+            "attribute_not_exists(vote_type)"
+        )
+        assert dog["Update"]["UpdateExpression"] == "ADD wag_count :inc"
+
+    def test_switched_vote(self):
+        """Test a switched vote moves one count across"""
+        with patch.object(update, "dynamodb_client") as mock_client:
+            mock_client.transact_write_items.side_effect = [
+                transaction_canceled("ConditionalCheckFailed", "None"),
+                {},
+            ]
+            response = update.lambda_handler(vote_event("growl"), None)
+
+        assert response["statusCode"] == 200
+        vote_row, dog = mock_client.transact_write_items.call_args.kwargs[
+            "TransactItems"
+        ]
+        assert vote_row["Update"]["ConditionExpression"] == "vote_type = :previous"
+        assert vote_row["Update"]["ExpressionAttributeValues"][":previous"] == {
+            "S": "wag"
+        }
+        assert dog["Update"]["UpdateExpression"] == (
+            "ADD growl_count :inc, wag_count :dec"
+        )
+
+    def test_repeated_vote_changes_nothing(self):
+        """Test repeating the same vote (e.g. a client retry) counts once"""
+        with patch.object(update, "dynamodb_client") as mock_client:
+            mock_client.transact_write_items.side_effect = [
+                transaction_canceled("ConditionalCheckFailed", "None"),
+                transaction_canceled("ConditionalCheckFailed", "None"),
+            ]
+            response = update.lambda_handler(vote_event("wag"), None)
+
+        assert response["statusCode"] == 200
+        assert mock_client.transact_write_items.call_count == 2
+
+    def test_failed_write_is_an_error(self):
+        """Test a throttled transaction is reported rather than half applied"""
+        throttled = ClientError(
+            {"Error": {"Code": "ThrottlingException", "Message": ""}},
+            "TransactWriteItems",
+        )
+        with patch.object(update, "dynamodb_client") as mock_client:
+            mock_client.transact_write_items.side_effect = throttled
+            response = update.lambda_handler(vote_event("wag"), None)
+
+        assert response["statusCode"] == 500
+        mock_client.update_item.assert_not_called()
+
+    def test_non_string_user_id(self):
+        """Test a numeric user ID is rejected"""
+        with patch.object(update, "dynamodb_client") as mock_client:
+            response = update.lambda_handler(vote_event(user_id=123), None)
+
+        assert response["statusCode"] == 400
+        assert "User ID" in json.loads(response["body"])["error"]
+        mock_client.transact_write_items.assert_not_called()
+
+    def test_vote_on_missing_dog(self):
+        """Test a vote on a missing dog is refused without writing a vote row"""
+        with patch.object(update, "dynamodb_client") as mock_client:
+            mock_client.transact_write_items.side_effect = transaction_canceled(
+                "None", "ConditionalCheckFailed"
+            )
+            response = update.lambda_handler(vote_event("wag"), None)
+
+        assert response["statusCode"] == 404
+        # The vote row is only ever written inside the conditioned transaction
+        assert mock_client.transact_write_items.call_count == 1
+        mock_client.update_item.assert_not_called()
+        mock_client.put_item.assert_not_called()
+
+
+class TestImageUploadHandler:
+    """Test cases for the image upload handler"""
+
+    def test_sniff_image_type(self):
+        """Test image type detection from magic bytes"""
+        sniff = upload.sniff_image_type
+
+        assert sniff(b"\xff\xd8\xff\xe0" + b"\x00" * 8) == "image/jpeg"
+        assert sniff(b"\x89PNG\r\n\x1a\n" + b"\x00" * 4) == "image/png"
+        assert sniff(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+        assert sniff(b"GIF89a") is None
+        assert sniff(b"tiny") is None
@@ -20,6 +20,7 @@ from utils.logger import (
     log_api_response,
     log_database_operation,
     log_s3_operation,
+    bind_db_logger,
     LoggingMixin,
 )
 
@@ -55,6 +56,16 @@ class TestLoggingSetup:
 
         assert isinstance(logger, structlog.BoundLogger)
 
+    def test_setup_logging_configures_once(self):
+        """Test repeated setup with the same options skips reconfiguration"""
+        setup_logging(log_level="INFO", enable_json=True)
+
+        with patch("utils.logger.structlog.configure") as mock_configure:
+            setup_logging(service_name="another-service")
+            LoggingMixin()
+
+            mock_configure.assert_not_called()
+
 
 class TestLambdaLogger:
     """Test cases for Lambda logger"""
@@ -179,6 +190,17 @@ class TestDatabaseLogging:
         log_database_operation(mock_logger, operation="scan", table_name="test-table")
 
         mock_logger.info.assert_called_once()
+        call_kwargs = mock_logger.info.call_args[1]
+        assert "db_key" not in call_kwargs
+        assert "duration_ms" not in call_kwargs
+
+    def test_bind_db_logger(self, mock_logger):
+        """Test pre-bound database logger methods"""
+        info, error = bind_db_logger(mock_logger, "test-table")
+
+        mock_logger.bind.assert_called_once_with(db_table="test-table")
+        assert info is mock_logger.bind.return_value.info
+        assert error is mock_logger.bind.return_value.error
 
 
 class TestS3Logging:
@@ -258,7 +280,8 @@ class TestLoggingMixin:
 
             mock_info.assert_called_once()
             call_args = mock_info.call_args
-            assert "Method called: test_method" in call_args[0]
+            assert "method_called" in call_args[0]
+            assert call_args[1]["method"] == "test_method"
 
     def test_log_error(self):
         """Test error logging"""
@@ -272,7 +295,8 @@ class TestLoggingMixin:
 
             mock_error.assert_called_once()
             call_args = mock_error.call_args
-            assert "Error occurred: Test error" in call_args[0]
+            assert "error" in call_args[0]
+            assert call_args[1]["error_message"] == "Test error"
 
     def test_log_error_no_context(self):
         """Test error logging without context"""
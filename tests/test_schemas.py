@@ -17,6 +17,7 @@ from schemas import (
     VoteSchema,
     ShelterSchema,
     FilterSchema,
+    ImageSchema,
     EncryptionUtils,
     ResponseFormatter,
 )
@@ -64,6 +65,48 @@ class TestDogSchema:
         assert isinstance(record["dog_age_years"], (int, float))
         assert record["dog_age_years"] > 0
 
+    def test_create_dog_record_prevalidated_species(self, valid_dog_data):
+        """Test a validated caller can skip the species comparison"""
+        valid_dog_data["dog_species"] = "Yellow Lab Mix"
+
+        record = DogSchema.create_dog_record(**valid_dog_data, is_labrador=True)
+        unvalidated = DogSchema.create_dog_record(**valid_dog_data)
+
+        assert record["is_labrador"] is True
+        assert unvalidated["is_labrador"] is False
+
+    def test_create_dog_record_unparseable_birthday(self, valid_dog_data):
+        """Test age falls back to zero when the birthday cannot be parsed"""
+        valid_dog_data["dog_birthday"] = "sometime in 2014"
+
+        record = DogSchema.create_dog_record(**valid_dog_data)
+
+        assert record["dog_age_years"] == 0
+
+    def test_create_reuses_validated_birthday(self, valid_dog_data):
+        """Test create_dog_record reuses the birthday parsed by validation"""
+        from schemas import _parse_mdy
+
+        valid_dog_data["dog_birthday"] = "5/17/2016"
+        DogSchema.validate_dog_data(valid_dog_data)
+        hits_before = _parse_mdy.cache_info().hits
+
+        DogSchema.create_dog_record(**valid_dog_data)
+
+        assert _parse_mdy.cache_info().hits == hits_before + 1
+
+    def test_build_dog_record_matches_dict(self, valid_dog_data):
+        """Test the tuple-backed record converts to the stored dict shape"""
+        record = DogSchema.build_dog_record(**valid_dog_data)
+        as_dict = record.to_dict()
+
+        assert record.state == "VA"
+        assert as_dict["dog_id"] == record.dog_id
+        assert as_dict["dog_name_encrypted"] == ""
+        assert as_dict["dog_photo_400x400_url"] == ""
+        assert as_dict["status"] == "available"
+        assert len(as_dict) == 22
+
     def test_validate_dog_data_success(self, valid_dog_data):
         """Test successful dog data validation"""
         is_valid, message = DogSchema.validate_dog_data(valid_dog_data)
@@ -89,6 +132,15 @@ class TestDogSchema:
         assert is_valid is False
         assert "Only Labrador Retrievers are allowed" in message
 
+    def test_validate_dog_data_species_spellings(self, valid_dog_data):
+        """Test validation accepts the short Labrador spellings"""
+        for species in ("Labrador", " LAB ", "labrador retriever"):
+            valid_dog_data["dog_species"] = species
+
+            is_valid, _ = DogSchema.validate_dog_data(valid_dog_data)
+
+            assert is_valid is True
+
     def test_validate_dog_data_invalid_weight(self, valid_dog_data):
         """Test validation with invalid weight"""
         valid_dog_data["dog_weight"] = "thirty pounds"
@@ -107,6 +159,15 @@ class TestDogSchema:
         assert is_valid is False
         assert "MM/DD/YYYY format" in message
 
+    def test_validate_dog_data_out_of_range_date(self, valid_dog_data):
+        """Test validation rejects well-formed but impossible dates"""
+        valid_dog_data["shelter_entry_date"] = "02/30/2019"
+
+        is_valid, message = DogSchema.validate_dog_data(valid_dog_data)
+
+        assert is_valid is False
+        assert "MM/DD/YYYY format" in message
+
 
 class TestUserSchema:
     """Test cases for UserSchema"""
@@ -168,6 +229,13 @@ class TestVoteSchema:
 
         assert record["vote_type"] == "growl"  # Should be lowercase
 
+    def test_create_vote_record_timestamp_format(self):
+        """Test record timestamps are ISO 8601 with microseconds"""
+        record = VoteSchema.create_vote_record("user-1", "dog-1", "wag")
+
+        parsed = datetime.strptime(record["created_at"], "%Y-%m-%dT%H:%M:%S.%f")
+        assert abs((datetime.utcnow() - parsed).total_seconds()) < 60
+
     def test_validate_vote_type_valid(self):
         """Test validation of valid vote types"""
         assert VoteSchema.validate_vote_type("wag") is True
@@ -267,6 +335,60 @@ class TestFilterSchema:
         assert filters == {}
 
 
+class TestImageSchema:
+    """Test cases for ImageSchema"""
+
+    def test_validate_image_upload_invalid_base64_charset(self):
+        """Test validation with a correctly padded but non-base64 payload"""
+        data = {"image_data": "dGVz!A==", "content_type": "image/jpeg"}
+
+        is_valid, message = ImageSchema.validate_image_upload(data)
+
+        assert is_valid is False
+        assert "Invalid base64 image data" in message
+
+    def test_validate_image_upload_line_wrapped_base64(self):
+        """Test validation accepts MIME-style line-wrapped base64"""
+        data = {"image_data": "dGVz\r\ndA==\n", "content_type": "image/jpeg"}
+
+        is_valid, message = ImageSchema.validate_image_upload(data)
+
+        assert is_valid is True
+        assert message == "Valid"
+
+    def test_get_supported_formats(self):
+        """Test getting supported formats"""
+        formats = ImageSchema.get_supported_formats()
+
+        assert isinstance(formats, frozenset)
+        assert "image/jpeg" in formats
+        assert "image/png" in formats
+
+    def test_get_max_file_size(self):
+        """Test getting max file size"""
+        max_size = ImageSchema.get_max_file_size()
+
+        assert isinstance(max_size, int)
+        assert max_size == 50 * 1024 * 1024  # 50MB
+
+    def test_get_resize_configurations(self):
+        """Test getting resize configurations"""
+        configs = ImageSchema.get_resize_configurations()
+
+        assert isinstance(configs, tuple)
+
+        # Check that required configs exist
+        config_names = [config["name"] for config in configs]
+        assert "400x400" in config_names
+        assert "50x50" in config_names
+
+        # Check config structure
+        for config in configs:
+            assert isinstance(config["size"], tuple)
+            assert len(config["size"]) == 2
+            assert "format" in config
+
+
 class TestEncryptionUtils:
     """Test cases for EncryptionUtils"""
 
@@ -294,6 +416,12 @@ class TestEncryptionUtils:
 
         assert decrypted == "Unknown"
 
+    def test_decrypt_non_utf8_data(self):
+        """Test decryption of base64 that is not UTF-8 text"""
+        decrypted = EncryptionUtils.decrypt_dog_name("//79")
+
+        assert decrypted == "Unknown"
+
     def test_encrypt_special_characters(self):
         """Test encryption with special characters"""
         special_name = "Fido-123 & Buddy!"
@@ -367,6 +495,27 @@ class TestResponseFormatter:
         body = json.loads(response["body"])
         assert body["error"] == error_message
 
+    def test_success_response_non_ascii(self):
+        """Test response bodies round-trip non-ASCII text"""
+        response = ResponseFormatter.success_response({"dog_name": "Café"})
+
+        import json
+
+        body = json.loads(response["body"])
+        assert body["data"]["dog_name"] == "Café"
+
+    def test_success_response_decimals(self):
+        """Test DynamoDB Decimals are encoded as JSON numbers"""
+        from decimal import Decimal
+        import json
+
+        response = ResponseFormatter.success_response(
+            {"dog_weight": Decimal("32"), "dog_age_years": Decimal("4.5")}
+        )
+        body = json.loads(response["body"])
+
+        assert body["data"] == {"dog_weight": 32, "dog_age_years": 4.5}
+
     def test_response_cors_headers(self):
         """Test that responses include proper CORS headers"""
         response = ResponseFormatter.success_response({})